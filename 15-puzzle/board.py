@@ -0,0 +1,90 @@
+#Packed board representation for the sliding puzzle.
+#A state is a single int holding one tile per cell, `bits` bits wide, cell 0 in the lowest bits.
+#The blank (0) position is tracked separately so moves never have to search for it.
+
+from typing import Iterator, Tuple
+
+
+class Board():
+    def __init__(self,size:int):
+        """Precomputes the layout, goal state and move table of a `size` x `size` puzzle"""
+        self.size = size
+        self.cells = size*size
+        self.bits = max(4,(self.cells-1).bit_length())
+        self.mask = (1 << self.bits) - 1
+
+        # neighbours[i] holds every cell the blank at `i` can swap with
+        self.neighbours:list[Tuple[int,...]] = []
+        for i in range(self.cells):
+            row,col = divmod(i,size)
+            nexts = []
+            for dr,dc in ((-1,0),(1,0),(0,-1),(0,1)):
+                if 0<=row+dr<size and 0<=col+dc<size:
+                    nexts.append((row+dr)*size+col+dc)
+            self.neighbours.append(tuple(nexts))
+        self.shifts = tuple(i*self.bits for i in range(self.cells))
+
+        solved = list(range(1,self.cells))
+        solved.append(0)
+        self.goal,self.goal_blank = self.pack_tiles(solved)
+
+    def pack_tiles(self,tiles:list[int])->Tuple[int,int]:
+        """Packs a flat list of tiles into `(state, blank)`"""
+        state = 0
+        for i,tile in enumerate(tiles):
+            state |= tile << self.shifts[i]
+        return state,tiles.index(0)
+
+    def pack(self,grid:list[list[int]])->Tuple[int,int]:
+        """Packs a 2D board into `(state, blank)`"""
+        return self.pack_tiles([tile for row in grid for tile in row])
+
+    def tile_at(self,state:int,i:int)->int:
+        """Returns the tile at cell `i`"""
+        return (state >> self.shifts[i]) & self.mask
+
+    def tiles(self,state:int)->list[int]:
+        """Unpacks a state into a flat list of tiles"""
+        mask = self.mask
+        return [(state >> shift) & mask for shift in self.shifts]
+
+    def unpack(self,state:int)->list[list[int]]:
+        """Unpacks a state into a 2D board"""
+        tiles = self.tiles(state)
+        return [tiles[i:i+self.size] for i in range(0,self.cells,self.size)]
+
+    def move(self,state:int,blank:int,i:int)->int:
+        """Slides the tile at cell `i` into the blank cell and returns the new state"""
+        tile = (state >> self.shifts[i]) & self.mask
+        return state - (tile << self.shifts[i]) + (tile << self.shifts[blank])
+
+    def successors(self,state:int,blank:int)->Iterator[Tuple[int,int,int]]:
+        """Yields `(new_state, new_blank, tile)` for every legal move, `new_blank` is where the tile came from"""
+        mask = self.mask
+        shifts = self.shifts
+        to = shifts[blank]
+        for i in self.neighbours[blank]:
+            tile = (state >> shifts[i]) & mask
+            yield state - (tile << shifts[i]) + (tile << to),i,tile
+
+    def solvable(self,tiles:list[int])->bool:
+        """
+        Checks in O(n²) whether `tiles` can reach the goal.
+        Every move swaps the blank with a neighbour, so the parity of the board as a permutation
+        of the cells always matches the parity of the blank's distance from its goal cell.
+        """
+        if sorted(tiles) != list(range(self.cells)):
+            raise ValueError(f"Board must hold each of 0..{self.cells-1} exactly once")
+        seen = [False]*self.cells
+        cycles = 0
+        for i in range(self.cells):
+            if not seen[i]:
+                cycles += 1
+                j = i
+                while not seen[j]:
+                    seen[j] = True
+                    # tile `t` belongs in cell t-1, the blank in the last cell
+                    j = (tiles[j]-1) % self.cells
+        blank_row,blank_col = divmod(tiles.index(0),self.size)
+        blank_distance = (self.size-1-blank_row) + (self.size-1-blank_col)
+        return (self.cells-cycles) % 2 == blank_distance % 2
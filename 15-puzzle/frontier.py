@@ -0,0 +1,48 @@
+#Open list for A* style searches built on heapq.
+#Entries are never removed from the heap when a cheaper path to their state is found,
+#the old entry is just skipped when it is popped (lazy deletion).
+
+import heapq
+import math
+from itertools import count
+from typing import Any, Hashable
+
+
+class Frontier():
+    def __init__(self):
+        """Creates an empty frontier"""
+        self.heap:list[tuple] = []
+        self.cost_so_far:dict[Hashable,int] = {}
+        self.counter = count()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self,priority:float,cost:int,key:Hashable,item:Any) -> bool:
+        """
+        Queues `item` reached with path cost `cost` if that strictly improves on the best
+        known cost for `key`. Returns whether it was queued.
+        Ties on `priority` go to the deeper entry first, then to the oldest one.
+        """
+        if cost >= self.cost_so_far.get(key,math.inf):
+            return False
+        self.cost_so_far[key] = cost
+        heapq.heappush(self.heap,(priority,-cost,next(self.counter),key,item))
+        return True
+
+    def pop(self) -> tuple[float,int,Any]|None:
+        """Returns `(priority, cost, item)` of the best live entry, or None when empty"""
+        while self.heap:
+            priority,cost,_,key,item = heapq.heappop(self.heap)
+            if -cost == self.cost_so_far[key]:
+                return priority,-cost,item
+        return None
+
+    def peek(self) -> float:
+        """Returns the priority of the best live entry, or infinity when empty"""
+        while self.heap:
+            priority,cost,_,key,_ = self.heap[0]
+            if -cost == self.cost_so_far[key]:
+                return priority
+            heapq.heappop(self.heap)
+        return math.inf
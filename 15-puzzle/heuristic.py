@@ -0,0 +1,104 @@
+#Incremental Manhattan distance + linear conflict heuristic.
+#A score is the tuple `(manhattan, conflict)`; a move only changes one tile's position so
+#a child's score is derived from its parent's by re-scanning at most two rows or columns.
+
+from typing import Callable, Sequence, Tuple
+
+from board import Board
+
+Score = Tuple[int,int]
+
+
+class Evaluator():
+    def __init__(self,board:Board,target:Sequence[int]|None=None,conflicts:bool=True):
+        """
+        Creates an evaluator measuring distance to `target` (flat tiles, defaults to the solved board).
+        The conflict term makes the estimate inadmissible, `conflicts=False` scores plain Manhattan distance.
+        """
+        self.board = board
+        self.size = board.size
+        self.conflicts = conflicts
+        if target is None:
+            target = board.tiles(board.goal)
+        self.goal_row = [0]*board.cells
+        self.goal_col = [0]*board.cells
+        for i,tile in enumerate(target):
+            self.goal_row[tile],self.goal_col[tile] = divmod(i,self.size)
+
+    def row_conflict(self,values:Sequence[int],row:int)->int:
+        """Conflicts between the tiles of `values` that belong in `row`"""
+        conflict = 0
+        max_col = -1
+        goal_row,goal_col = self.goal_row,self.goal_col
+        for value in values:
+            if value != 0 and goal_row[value] == row:
+                if goal_col[value] > max_col:
+                    max_col = goal_col[value]
+                else:
+                    conflict += 2
+        return conflict
+
+    def col_conflict(self,values:Sequence[int],col:int)->int:
+        """Conflicts between the tiles of `values` that belong in `col`"""
+        conflict = 0
+        max_row = -1
+        goal_row,goal_col = self.goal_row,self.goal_col
+        for value in values:
+            if value != 0 and goal_col[value] == col:
+                if goal_row[value] > max_row:
+                    max_row = goal_row[value]
+                else:
+                    conflict += 2
+        return conflict
+
+    def evaluate(self,tiles:Sequence[int])->Score:
+        """Scores a whole board from scratch"""
+        size = self.size
+        distance = 0
+        for i,tile in enumerate(tiles):
+            if tile != 0:
+                row,col = divmod(i,size)
+                distance += abs(row - self.goal_row[tile]) + abs(col - self.goal_col[tile])
+        if not self.conflicts:
+            return distance,0
+        conflict = 0
+        for row in range(size):
+            conflict += self.row_conflict(tiles[row*size:(row+1)*size],row)
+        for col in range(size):
+            conflict += self.col_conflict(tiles[col::size],col)
+        return distance,conflict
+
+    def update(self,score:Score,at:Callable[[int],int],tile:int,src:int,dst:int)->Score:
+        """
+        Scores the child reached by sliding `tile` from cell `src` into the blank at `dst`.
+        `score` is the parent's score and `at(i)` returns the child's tile at cell `i`.
+        """
+        size = self.size
+        distance,conflict = score
+        src_row,src_col = divmod(src,size)
+        dst_row,dst_col = divmod(dst,size)
+        goal_row,goal_col = self.goal_row[tile],self.goal_col[tile]
+        distance += (abs(dst_row - goal_row) + abs(dst_col - goal_col)
+                     - abs(src_row - goal_row) - abs(src_col - goal_col))
+        if not self.conflicts:
+            return distance,conflict
+
+        # The order of the other tiles along the line of motion is unchanged,
+        # only the two crossed lines gain or lose `tile`
+        if src_col == dst_col:
+            for row,col,before in ((src_row,src_col,tile),(dst_row,dst_col,0)):
+                values = [at(row*size+c) for c in range(size)]
+                conflict += self.row_conflict(values,row)
+                values[col] = before
+                conflict -= self.row_conflict(values,row)
+        else:
+            for row,col,before in ((src_row,src_col,tile),(dst_row,dst_col,0)):
+                values = [at(r*size+col) for r in range(size)]
+                conflict += self.col_conflict(values,col)
+                values[row] = before
+                conflict -= self.col_conflict(values,col)
+        return distance,conflict
+
+    def value(self,score:Score)->int:
+        """Collapses a score into the heuristic estimate"""
+        return score[0] + score[1]
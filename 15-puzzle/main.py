@@ -1,155 +1,387 @@
 #This is a 15-puzzle solver using A* algorithm.
 #This particular cost fuction is weighted so it gives results fast rather than optimal
-#Also it does not check if the board is solvable or not
+#Run with --pdb to use the pattern database heuristic unweighted, which gives optimal results
+#Run with --ida to use IDA* instead, which only keeps the current path in memory
+#Run with --bidirectional to search from both the start and the goal and meet in the middle
+#Run with --batch FILE to solve one board per line of FILE and report stats for each
+#Unsolvable boards are rejected up front with a parity check
+#--max-nodes and --time-limit give up on a board once it exceeds that budget
 
-from copy import deepcopy
-from queue import PriorityQueue
+import argparse
+import math
+import sys
+import time
+from functools import lru_cache, partial
 
-from typing import Self, Tuple, Iterator
+from typing import Self, Sequence, Tuple
+
+from board import Board
+from frontier import Frontier
+from heuristic import Evaluator
+from patterndb import PatternDatabase
 
 class Node():
-    def __init__(self,state:list[list[int]],parent:Self|None=None,moved:Tuple[int,int]|None=None):
-        """Creates a node with present state and parent state"""
+    def __init__(self,state:int,blank:int,parent:Self|None=None,moved:int|None=None,score:tuple|None=None):
+        """Creates a node with packed present state, blank position, parent node and heuristic score"""
         self.state = state
+        self.blank = blank
         self.parent = parent
         self.moved = moved
+        self.score = score
 
     def __hash__(self) -> int:
-        k=[]
-        for i in self.state:
-            k.append(tuple(i))
-        return hash(tuple(k))
-    
+        return hash(self.state)
+
     def __eq__(self,other)-> bool:
         return (self.state == other.state)
-        
-    def __lt__(self,other)->bool:
-        return False
-    
+
     def __repr__(self) -> str:
         if self.parent is not None:
-            p = self.parent.state
+            p = hex(self.parent.state)
         else:
             p = None
-        return f"state: {self.state}\n parent: {p}\n move = {self.moved} "
-
-
-global size
-
-
-def find_empty(state:list[list[int]])->Tuple[int,int]:
-    """Finds the empty space in the puzzle"""
-    for i in range(size):
-        for j in range(size):
-            if state[i][j] == 0:
-                return (i,j)
-    return(-1,-1)
-
-def swapable(state: list[list[int]]) -> Iterator[Tuple[int,int]]:
-    empty = find_empty(state)    
-    nexts = [(-1,0),(1,0),(0,-1),(0,1)]
-    for n in nexts:
-        if 0<=empty[0]+n[0]<size and 0<=empty[1]+n[1]<size:
-            yield (empty[0]+n[0],empty[1]+n[1])
-
-
-def swap(state:list[list[int]],idx1:Tuple[int,int]):
-    state = deepcopy(state)
-    empty = find_empty(state)
-    state[idx1[0]][idx1[1]],state[empty[0]][empty[1]] = state[empty[0]][empty[1]],state[idx1[0]][idx1[1]]
-    return state
-
-
-def manhatten_distance(state:list[list[int]])->int:
-    distance = 0
-    for i in range(size):
-        for j in range(size):
-            tile = state[i][j]
-            if tile != 0:
-                target_row = (tile - 1) // size
-                target_col = (tile - 1) % size
-                distance += abs(i - target_row) + abs(j - target_col)
-    return distance
-
-
-def linear_conflict(position):
-        conflict = 0
-        # Row conflicts
-        for row in range(size):
-            max_val = -1
-            for col in range(size):
-                value = position[row][col]
-                if value != 0 and (value - 1) // size == row:
-                    if value > max_val:
-                        max_val = value
-                    else:
-                        conflict += 2
-        # Column conflicts
-        for col in range(size):
-            max_val = -1
-            for row in range(size):
-                value = position[row][col]
-                if value != 0 and (value - 1) % size == col:
-                    if value > max_val:
-                        max_val = value
-                    else:
-                        conflict += 2
-        return conflict
-
-
-distance = lambda x : manhatten_distance(x) + linear_conflict(x)
-
-
-size = int(input("Enter the size of the puzzle: "))
-solved = list(range(1,size**2))
-solved.append(0)
-solvedState = [solved[i:i+size] for i in range(0,len(solved),size)]
-
-
-start = list(map(int,input("Enter the start state of the puzzle: ").split()))
-startState = [start[i:i+size] for i in range(0,len(solved),size)]
-
-
-
-def astar(start1: list[list[int]],goal: list[list[int]]):
-    start = Node(start1)
-    queue:PriorityQueue[Tuple[int,Node]] = PriorityQueue()
-    queue.put((0+distance(start.state),start))
-    explored:set[Node] = set()
-    cost_so_far = {start:0}
-    
-    while not queue.empty():
-        _,state = queue.get()
-        
-        if state.state == goal:
+        return f"state: {hex(self.state)}\n parent: {p}\n move = {self.moved} "
+
+
+class Solution():
+    SOLVED = "solved"
+    NOT_FOUND = "no solution"
+    OVER_BUDGET = "over budget"
+
+    def __init__(self,moves:list[int]|None,expanded:int,seconds:float,status:str|None=None):
+        """Result of a solve: the tiles to move (None if not found), nodes expanded and time taken"""
+        self.moves = moves
+        self.expanded = expanded
+        self.seconds = seconds
+        if status is None:
+            status = Solution.NOT_FOUND if moves is None else Solution.SOLVED
+        self.status = status
+
+    def __repr__(self) -> str:
+        length = None if self.moves is None else len(self.moves)
+        return f"Solution(status={self.status!r}, length={length}, expanded={self.expanded}, seconds={self.seconds:.3f})"
+
+
+class BudgetExceeded(Exception):
+    def __init__(self,expanded:int):
+        super().__init__(f"Gave up after expanding {expanded} nodes")
+        self.expanded = expanded
+
+
+class Budget():
+    def __init__(self,max_nodes:int|None=None,seconds:float|None=None):
+        """Limits a search to `max_nodes` expansions and/or `seconds` of wall time"""
+        self.max_nodes = max_nodes
+        self.deadline = None if seconds is None else time.perf_counter() + seconds
+
+    def check(self,expanded:int):
+        """Raises BudgetExceeded once the search has gone over budget, the clock is read every 1024 nodes"""
+        if self.max_nodes is not None and expanded >= self.max_nodes:
+            raise BudgetExceeded(expanded)
+        if self.deadline is not None and expanded & 1023 == 0 and time.perf_counter() > self.deadline:
+            raise BudgetExceeded(expanded)
+
+
+Heuristic = Evaluator|PatternDatabase
+
+
+def astar(board:Board,tiles:list[int],evaluator:Heuristic,weight:float=2,budget:Budget|None=None)->Tuple[list[int]|None,int]:
+    """A* search, returns the tiles to move and the number of nodes expanded"""
+    start = Node(*board.pack_tiles(tiles))
+    start.score = evaluator.evaluate(tiles)
+    queue = Frontier()
+    queue.push(0+evaluator.value(start.score),0,start.state,start)
+    explored:set[int] = set()
+
+    while (popped := queue.pop()) is not None:
+        _,cost,state = popped
+
+        if state.state == board.goal:
             path =[]
             while state.parent is not None:
-                path.append(state)
+                path.append(state.moved)
                 state = state.parent
-            path.append(state)  
             path.reverse()
-            return path
-        
-        if state in explored:
-            continue
-        
-        explored.add(state)
-        for i in swapable(state.state):
-            newState = swap(state.state,i)
-            newCost = cost_so_far[state] + 1
-            new = Node(newState,state,i)
-            if new in explored:
+            return path,len(explored)
+
+        explored.add(state.state)
+        if budget is not None:
+            budget.check(len(explored))
+        for newState,blank,tile in board.successors(state.state,state.blank):
+            if newState in explored:
+                continue
+            newCost = cost + 1
+            if newCost >= queue.cost_so_far.get(newState,newCost+1):
+                continue
+            score = evaluator.update(state.score,partial(board.tile_at,newState),tile,blank,state.blank)
+            priority = newCost + int(weight*evaluator.value(score))
+            queue.push(priority,newCost,newState,Node(newState,blank,state,tile,score))
+
+    return None,len(explored)
+
+
+def idastar(board:Board,tiles:list[int],evaluator:Heuristic,weight:float=1,budget:Budget|None=None)->Tuple[list[int]|None,int]:
+    """
+    Iterative deepening A*. Moves are made and undone in place on a single board so memory
+    is proportional to the solution depth. Returns the tiles to move and the number of nodes expanded.
+    """
+    tiles = bytearray(tiles)
+    goal_tiles = bytes(board.tiles(board.goal))
+    neighbours = board.neighbours
+    at = tiles.__getitem__
+    path:list[int] = []
+    found = -1
+    expanded = 0
+
+    def search(blank:int,previous:int,cost:int,score:tuple,bound:int)->float:
+        nonlocal expanded
+        f = cost + int(weight*evaluator.value(score))
+        if f > bound:
+            return f
+        if tiles == goal_tiles:
+            return found
+        expanded += 1
+        if budget is not None:
+            budget.check(expanded)
+        minimum = math.inf
+        for cell in neighbours[blank]:
+            # never slide the tile just moved straight back
+            if cell == previous:
+                continue
+            tile = tiles[cell]
+            tiles[blank],tiles[cell] = tile,0
+            path.append(tile)
+            t = search(cell,blank,cost+1,evaluator.update(score,at,tile,cell,blank),bound)
+            if t == found:
+                return found
+            minimum = min(minimum,t)
+            path.pop()
+            tiles[blank],tiles[cell] = 0,tile
+        return minimum
+
+    score = evaluator.evaluate(tiles)
+    bound = int(weight*evaluator.value(score))
+    while True:
+        t = search(tiles.index(0),-1,0,score,bound)
+        if t == found:
+            return path,expanded
+        if t == math.inf:
+            return None,expanded
+        bound = t
+
+
+def bidirectional(board:Board,tiles:list[int],evaluator:Heuristic,weight:float=1,budget:Budget|None=None)->Tuple[list[int]|None,int]:
+    """
+    Meet in the middle (MM) bidirectional search between the start and the goal.
+    Each direction keeps its own frontier and parent links keyed on packed states and orders
+    nodes by max(g + weight*h, 2g). The backward direction measures Manhattan distance to the start.
+    Stops once the best path found through a state seen from both sides is no longer than
+    the lowest priority left in either frontier. Returns the tiles to move and the number of nodes expanded.
+    """
+    start,start_blank = board.pack_tiles(tiles)
+    if start == board.goal:
+        return [],0
+    backward = Evaluator(board,tiles,conflicts=False)
+    evaluators = (evaluator,backward)
+    goal_tiles = board.tiles(board.goal)
+    frontiers = (Frontier(),Frontier())
+    # parents[side][state] is (parent state, tile slid from the parent into this state)
+    parents:Tuple[dict[int,Tuple[int,int]],dict[int,Tuple[int,int]]] = ({},{})
+    for side,(state,blank,side_tiles) in enumerate(((start,start_blank,tiles),(board.goal,board.goal_blank,goal_tiles))):
+        score = evaluators[side].evaluate(side_tiles)
+        frontiers[side].push(max(weight*evaluators[side].value(score),0),0,state,(state,blank,score))
+
+    best = math.inf
+    meet = None
+    expanded = 0
+    while frontiers[0] and frontiers[1]:
+        lowest = (frontiers[0].peek(),frontiers[1].peek())
+        if best <= min(lowest):
+            break
+        side = 0 if lowest[0] <= lowest[1] else 1
+        popped = frontiers[side].pop()
+        if popped is None:
+            break
+        _,cost,(state,blank,score) = popped
+        expanded += 1
+        if budget is not None:
+            budget.check(expanded)
+
+        frontier,other = frontiers[side],frontiers[1-side]
+        for newState,newBlank,tile in board.successors(state,blank):
+            newCost = cost + 1
+            newScore = evaluators[side].update(score,partial(board.tile_at,newState),tile,newBlank,blank)
+            priority = max(newCost + weight*evaluators[side].value(newScore),2*newCost)
+            if not frontier.push(priority,newCost,newState,(newState,newBlank,newScore)):
+                continue
+            parents[side][newState] = (state,tile)
+            if newState in other.cost_so_far and newCost + other.cost_so_far[newState] < best:
+                best = newCost + other.cost_so_far[newState]
+                meet = newState
+
+    if meet is None:
+        return None,expanded
+    path = []
+    state = meet
+    while state != start:
+        state,tile = parents[0][state]
+        path.append(tile)
+    path.reverse()
+    # walking the backward links from the meeting state slides each tile back towards the goal
+    state = meet
+    while state != board.goal:
+        state,tile = parents[1][state]
+        path.append(tile)
+    return path,expanded
+
+
+SEARCHES = {"astar":astar,"ida":idastar,"bidirectional":bidirectional}
+
+
+@lru_cache(maxsize=None)
+def get_board(size:int)->Board:
+    return Board(size)
+
+
+@lru_cache(maxsize=None)
+def get_heuristic(size:int,pdb:bool,conflicts:bool=True)->Heuristic:
+    """Heuristics are built once per process and reused by every solve"""
+    if pdb:
+        return PatternDatabase(get_board(size))
+    return Evaluator(get_board(size),conflicts=conflicts)
+
+
+def solve(board:Sequence[int]|Sequence[Sequence[int]],size:int,search:str="astar",pdb:bool=False,weight:float|None=None,
+          max_nodes:int|None=None,time_limit:float|None=None)->Solution:
+    """
+    Solves `board` (flat or nested rows) of a `size` x `size` puzzle.
+    `search` is "astar", "ida" or "bidirectional". Without a pattern database A* is weighted by 2 for speed,
+    otherwise searches are unweighted unless `weight` is given.
+    Bidirectional search uses plain Manhattan distance unless `pdb` is set, since both directions need an admissible estimate.
+    The search gives up with an "over budget" solution after `max_nodes` expansions or `time_limit` seconds.
+    Raises ValueError if the board is malformed or unsolvable.
+    """
+    tiles = [tile for row in board for tile in row] if board and isinstance(board[0],Sequence) else list(board)
+    if len(tiles) != size*size:
+        raise ValueError(f"Expected {size*size} tiles, got {len(tiles)}")
+    packed = get_board(size)
+    if not packed.solvable(tiles):
+        raise ValueError("Board is not solvable")
+    if weight is None:
+        weight = 2 if search == "astar" and not pdb else 1
+    if search not in SEARCHES:
+        raise ValueError(f"Unknown search {search!r}")
+    evaluator = get_heuristic(size,pdb,search != "bidirectional")
+
+    budget = None
+    if max_nodes is not None or time_limit is not None:
+        budget = Budget(max_nodes,time_limit)
+    started = time.perf_counter()
+    try:
+        moves,expanded = SEARCHES[search](packed,tiles,evaluator,weight,budget)
+    except BudgetExceeded as e:
+        return Solution(None,e.expanded,time.perf_counter()-started,Solution.OVER_BUDGET)
+    return Solution(moves,expanded,time.perf_counter()-started)
+
+
+def read_boards(filename:str,size:int|None=None)->list[Tuple[int,list[int]]|str]:
+    """
+    Reads one whitespace separated board per non empty line, returns `(size, tiles)` pairs,
+    or an error message in place of each line that is not a board
+    """
+    boards = []
+    with open(filename) as f:
+        for line in f:
+            if not line.split():
+                continue
+            try:
+                tiles = list(map(int,line.split()))
+            except ValueError:
+                boards.append(f"Not whitespace separated integers: {line.strip()!r}")
+                continue
+            n = size or math.isqrt(len(tiles))
+            if size is None and n*n != len(tiles):
+                boards.append(f"{len(tiles)} tiles do not make a square board")
                 continue
-            cost_so_far[new] = newCost
-            priority = newCost + int(2*distance(newState))
-            queue.put((priority,new))
-                
-    return None
-    
-out = astar(startState,solvedState)
-l = len(out)
-print("Pieces to move -> ")
-for i in range(l-1):
-    base = out[i].state
-    move = out[i+1].moved
-    print(base[move[0]][move[1]],end = " ") 
+            boards.append((n,tiles))
+    return boards
+
+
+def report(i:int,result:Solution|str):
+    """Prints one row of batch output, `result` is a Solution or an error message"""
+    if isinstance(result,str):
+        print(f"{i}\terror: {result}\t-\t-\t-")
+    elif result.moves is None:
+        print(f"{i}\t{result.status}\t-\t{result.expanded}\t{result.seconds:.3f}")
+    else:
+        print(f"{i}\t{result.status}\t{len(result.moves)}\t{result.expanded}\t{result.seconds:.3f}")
+
+
+def batch(filename:str,size:int|None=None,search:str="astar",pdb:bool=False,weight:float|None=None,
+          max_nodes:int|None=None,time_limit:float|None=None):
+    """Solves every board of `filename` and prints time, nodes expanded and path length of each"""
+    print("board\tstatus\tlength\texpanded\tseconds")
+    solved = 0
+    total = 0.0
+    boards = read_boards(filename,size)
+    for i,board in enumerate(boards,1):
+        if isinstance(board,str):
+            report(i,board)
+            continue
+        n,tiles = board
+        try:
+            solution = solve(tiles,n,search,pdb,weight,max_nodes,time_limit)
+        except ValueError as e:
+            report(i,str(e))
+            continue
+        total += solution.seconds
+        solved += solution.moves is not None
+        report(i,solution)
+    print(f"Solved {solved}/{len(boards)} boards in {total:.3f}s")
+
+
+def add_solver_arguments(parser:argparse.ArgumentParser):
+    """Options shared by the solver entry points"""
+    parser.add_argument("--pdb",action="store_true",help="use the pattern database heuristic")
+    parser.add_argument("--ida",action="store_true",help="use IDA* instead of A*")
+    parser.add_argument("--bidirectional",action="store_true",help="use bidirectional MM search instead of A*")
+    parser.add_argument("--weight",type=float,default=None,help="heuristic weight")
+    parser.add_argument("--size",type=int,default=None,help="board size for batches (default: from tile count)")
+    parser.add_argument("--max-nodes",type=int,default=None,help="give up on a board after expanding this many nodes")
+    parser.add_argument("--time-limit",type=float,default=None,help="give up on a board after this many seconds")
+
+
+def selected_search(args:argparse.Namespace)->str:
+    if args.ida:
+        return "ida"
+    if args.bidirectional:
+        return "bidirectional"
+    return "astar"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sliding puzzle solver")
+    parser.add_argument("--batch",metavar="FILE",help="solve one board per line of FILE")
+    add_solver_arguments(parser)
+    args = parser.parse_args()
+    search = selected_search(args)
+
+    if args.batch:
+        batch(args.batch,args.size,search,args.pdb,args.weight,args.max_nodes,args.time_limit)
+        return
+
+    size = int(input("Enter the size of the puzzle: "))
+    start = list(map(int,input("Enter the start state of the puzzle: ").split()))
+    try:
+        solution = solve(start,size,search,args.pdb,args.weight,args.max_nodes,args.time_limit)
+    except ValueError as e:
+        sys.exit(str(e))
+    if solution.moves is None:
+        sys.exit(f"No solution found ({solution.status})")
+    print("Pieces to move -> ")
+    for tile in solution.moves:
+        print(tile,end = " ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#Solves a file of boards across a pool of worker processes.
+#Heuristics are loaded in the parent before the pool starts so forked workers inherit them;
+#pattern database tables are memory mapped read-only, so every worker shares the same pages.
+#Results are printed as soon as each board finishes, in completion order.
+
+import argparse
+import multiprocessing
+import os
+import time
+from typing import Iterable, Iterator, Tuple
+
+from main import Solution, add_solver_arguments, get_heuristic, read_boards, report, selected_search, solve
+
+
+def solve_job(job:tuple) -> Tuple[int,Solution|str]:
+    """Worker entry point, returns the board number and its Solution or error message"""
+    i,size,tiles,options = job
+    try:
+        return i,solve(tiles,size,**options)
+    except ValueError as e:
+        return i,str(e)
+
+
+def solve_all(boards:Iterable[Tuple[int,list[int]]|str],workers:int|None=None,**options) -> Iterator[Tuple[int,Solution|str]]:
+    """
+    Solves `(size, tiles)` boards in parallel and yields `(board number, result)` as they finish.
+    Error messages in place of boards, as returned by `main.read_boards`, are yielded first.
+    `options` are passed to `main.solve`, e.g. `search`, `pdb`, `max_nodes` and `time_limit`.
+    """
+    boards = list(boards)
+    for i,board in enumerate(boards,1):
+        if isinstance(board,str):
+            yield i,board
+    for size in {board[0] for board in boards if not isinstance(board,str)}:
+        try:
+            get_heuristic(size,options.get("pdb",False),options.get("search") != "bidirectional")
+        except ValueError:
+            # reported per board by the workers
+            pass
+
+    jobs = [(i,*board,options) for i,board in enumerate(boards,1) if not isinstance(board,str)]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with context.Pool(workers) as pool:
+        yield from pool.imap_unordered(solve_job,jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel sliding puzzle batch solver")
+    parser.add_argument("file",help="file with one board per line")
+    parser.add_argument("--workers",type=int,default=os.cpu_count(),help="number of worker processes")
+    add_solver_arguments(parser)
+    args = parser.parse_args()
+
+    options = {
+        "search":selected_search(args),
+        "pdb":args.pdb,
+        "weight":args.weight,
+        "max_nodes":args.max_nodes,
+        "time_limit":args.time_limit,
+    }
+    boards = read_boards(args.file,args.size)
+    print("board\tstatus\tlength\texpanded\tseconds")
+    started = time.perf_counter()
+    solved = 0
+    for i,result in solve_all(boards,args.workers,**options):
+        report(i,result)
+        solved += not isinstance(result,str) and result.moves is not None
+    print(f"Solved {solved}/{len(boards)} boards in {time.perf_counter()-started:.3f}s with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#Additive disjoint pattern database heuristic.
+#The tiles are split into disjoint patterns; for each pattern a table holds the exact number of
+#moves of that pattern's tiles needed to bring them home, ignoring every other tile and the blank.
+#Since every move slides exactly one tile the tables can be summed and stay admissible.
+#Tables are built once by a breadth first search backwards from the goal, saved to disk and
+#memory mapped on later runs.
+
+import mmap
+import os
+from typing import Callable, Sequence, Tuple
+
+from board import Board
+
+Score = Tuple[int,...]
+
+DEFAULT_PARTITIONS = {
+    3: ((1,2,3,4),(5,6,7,8)),
+    4: ((1,5,6,9,10,13),(7,8,11,12,14,15),(2,3,4)),
+}
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),"pdb_cache")
+
+UNSEEN = 0xff
+
+
+class PatternDatabase():
+    def __init__(self,board:Board,partition:Sequence[Sequence[int]]|None=None,cache_dir:str|None=CACHE_DIR):
+        """
+        Loads (or builds and saves) one table per pattern of `partition`.
+        With `cache_dir=None` tables are only kept in memory.
+        """
+        if partition is None:
+            if board.size not in DEFAULT_PARTITIONS:
+                raise ValueError(f"No default partition for size {board.size}, pass one explicitly")
+            partition = DEFAULT_PARTITIONS[board.size]
+        partition = tuple(tuple(pattern) for pattern in partition)
+        tiles = sorted(tile for pattern in partition for tile in pattern)
+        if tiles != list(range(1,board.cells)):
+            raise ValueError("Partition must cover every tile exactly once")
+
+        self.board = board
+        self.partition = partition
+        self.bits = (board.cells-1).bit_length()
+        self.mask = (1 << self.bits) - 1
+
+        # owner[tile] is (pattern, slot of the tile inside the pattern index)
+        self.owner:list[Tuple[int,int]] = [(-1,-1)]*board.cells
+        for p,pattern in enumerate(partition):
+            for slot,tile in enumerate(pattern):
+                self.owner[tile] = (p,slot*self.bits)
+
+        self.tables:list[bytearray|mmap.mmap] = []
+        for pattern in partition:
+            if cache_dir is None:
+                self.tables.append(self.build(pattern))
+            else:
+                self.tables.append(self.load(pattern,cache_dir))
+
+    def filename(self,pattern:Sequence[int],cache_dir:str)->str:
+        return os.path.join(cache_dir,f"pdb{self.board.size}_{'-'.join(map(str,pattern))}.bin")
+
+    def load(self,pattern:Sequence[int],cache_dir:str)->mmap.mmap:
+        """Memory maps the table of `pattern`, building and saving it first if needed"""
+        path = self.filename(pattern,cache_dir)
+        length = 1 << (self.bits*len(pattern))
+        if not os.path.exists(path) or os.path.getsize(path) != length:
+            table = self.build(pattern)
+            os.makedirs(cache_dir,exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp,"wb") as f:
+                f.write(table)
+            os.replace(tmp,path)
+        with open(path,"rb") as f:
+            return mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+
+    def build(self,pattern:Sequence[int])->bytearray:
+        """
+        Breadth first search from the goal positions of `pattern`.
+        A pattern state is the cells of its tiles packed `bits` bits each; any pattern tile
+        may slide into a neighbouring cell not held by another pattern tile at a cost of 1.
+        """
+        bits,mask = self.bits,self.mask
+        neighbours = self.board.neighbours
+        shifts = [slot*bits for slot in range(len(pattern))]
+        table = bytearray([UNSEEN]) * (1 << (bits*len(pattern)))
+
+        start = 0
+        for shift,tile in zip(shifts,pattern):
+            start |= (tile-1) << shift
+        table[start] = 0
+        frontier = [start]
+        depth = 0
+        while frontier:
+            depth += 1
+            nexts = []
+            for index in frontier:
+                cells = [(index >> shift) & mask for shift in shifts]
+                for shift,cell in zip(shifts,cells):
+                    base = index - (cell << shift)
+                    for other in neighbours[cell]:
+                        if other in cells:
+                            continue
+                        child = base + (other << shift)
+                        if table[child] == UNSEEN:
+                            table[child] = depth
+                            nexts.append(child)
+            frontier = nexts
+        return table
+
+    def evaluate(self,tiles:Sequence[int])->Score:
+        """Returns the table index of every pattern for a whole board"""
+        score = [0]*len(self.partition)
+        for cell,tile in enumerate(tiles):
+            if tile != 0:
+                p,shift = self.owner[tile]
+                score[p] |= cell << shift
+        return tuple(score)
+
+    def update(self,score:Score,at:Callable[[int],int],tile:int,src:int,dst:int)->Score:
+        """Moves `tile` from `src` to `dst` inside the index of its pattern"""
+        p,shift = self.owner[tile]
+        score = list(score)
+        score[p] += (dst - src) << shift
+        return tuple(score)
+
+    def value(self,score:Score)->int:
+        return sum(table[index] for table,index in zip(self.tables,score))
@@ -1,3 +1,11 @@
+import math
+import sys
+from array import array
+from collections import deque
+
+from njug import describe, jug_set
+
+
 class Jug():
     def __init__(self,water:int,maxWater:int):
         self.water=water
@@ -95,7 +103,159 @@ def path_find(state:tuple[Jug],goal:int) -> list[tuple[Jug]] | None:
 
 
 
+def pour(x:int,y:int,Mx:int,My:int,rule:int) -> tuple[int,int]:
+    """Applies `rule` to the water levels `x`, `y` and returns the new levels"""
+    if rule==1:
+        return Mx,y
+    if rule==2:
+        return x,My
+    if rule==3:
+        return 0,y
+    if rule==4:
+        return x,0
+    if rule==5:
+        return x+y-My,My
+    if rule==6:
+        return Mx,x+y-Mx
+    if rule==7:
+        return 0,x+y
+    return x+y,0
+
+
+def solvable(Mx:int,My:int,goal:int) -> bool:
+    """
+    A volume can be measured iff it fits in the larger jug and is a
+    multiple of the gcd of both capacities. Two jugs of capacity 0 can only measure 0.
+    """
+    g=math.gcd(Mx,My)
+    if g==0:
+        return goal==0
+    return 0<=goal<=max(Mx,My) and goal%g==0
+
+
+def strategy(Mx:int,My:int,goal:int,forward:bool) -> list[tuple[int,int,int]]:
+    """
+    Simulates one of the two canonical pouring strategies until a jug holds `goal`:
+    always filling jug 1 and pouring it into jug 2, emptying jug 2 when full
+    (`forward`), or the same from jug 2 into jug 1.
+    Returns `(x, y, rule)` for every step, finishing with the other jug emptied.
+    The jug poured from must have a positive capacity, otherwise this never ends.
+    """
+    x=y=0
+    steps=[]
+    while x!=goal and y!=goal:
+        if forward:
+            if x==0:
+                rule=1
+            elif y==My:
+                rule=4
+            else:
+                rule=5 if x+y>My else 7
+        else:
+            if y==0:
+                rule=2
+            elif x==Mx:
+                rule=3
+            else:
+                rule=6 if x+y>Mx else 8
+        x,y=pour(x,y,Mx,My,rule)
+        steps.append((x,y,rule))
+    if x==goal and y!=0:
+        steps.append((x,0,4))
+    elif y==goal and x!=0:
+        steps.append((0,y,3))
+    return steps
+
+
+def pour_path(state:tuple[Jug],goal:int) -> list[tuple[tuple[Jug],int]] | None:
+    """
+    Finds the shortest path to `goal` without searching: feasibility comes from
+    the gcd and the path is the shorter of the two canonical strategies.
+    Returns the same `(state, rule)` steps as `path_find`.
+    """
+    j1,j2=state
+    Mx,My=j1.maxWater,j2.maxWater
+    if Mx<0 or My<0:
+        raise ValueError("jug capacities must not be negative")
+    if not solvable(Mx,My,goal):
+        return None
+    if goal==0:
+        return []
+    # a jug of capacity 0 cannot be poured from, so only the other strategy applies
+    candidates=[]
+    if Mx>0:
+        candidates.append(strategy(Mx,My,goal,True))
+    if My>0:
+        candidates.append(strategy(Mx,My,goal,False))
+    steps=min(candidates,key=len)
+    return [((Jug(x,Mx),Jug(y,My)),rule) for x,y,rule in steps]
+
+
+
+def bfs_path(state:tuple[Jug],goal:int) -> list[tuple[tuple[Jug],int]] | None:
+    """
+    Breadth first search over water levels encoded as `x*(My+1)+y`, with a bytearray
+    of visited states and parent/rule arrays for rebuilding the path, so memory is
+    bounded by (Mx+1)*(My+1). Returns the same `(state, rule)` steps as `path_find`.
+    """
+    j1,j2=state
+    Mx,My=j1.maxWater,j2.maxWater
+    width=My+1
+    visited=bytearray((Mx+1)*width)
+    parent=array("q",[-1])*len(visited)
+    rules=bytearray(len(visited))
+
+    start=j1.water*width+j2.water
+    visited[start]=1
+    queue=deque([start])
+    while queue:
+        index=queue.popleft()
+        x,y=divmod(index,width)
+        if (x,y)==(goal,0) or (x,y)==(0,goal):
+            path=[]
+            while index!=start:
+                x,y=divmod(index,width)
+                path.append(((Jug(x,Mx),Jug(y,My)),rules[index]))
+                index=parent[index]
+            path.reverse()
+            return path
+        for rule in (1,2,3,4,5 if x+y>My else 7,6 if x+y>Mx else 8):
+            nx,ny=pour(x,y,Mx,My,rule)
+            child=nx*width+ny
+            if not visited[child]:
+                visited[child]=1
+                parent[child]=index
+                rules[child]=rule
+                queue.append(child)
+    return None
+
+
+
+def many_jugs():
+    """
+    Answers any number of goals for one set of jugs. The reachability table
+    is built by a single search and reused for every goal.
+    """
+    capacities=tuple(map(int,input("enter the max water of every jug: ").split()))
+    jugs=jug_set(capacities)
+    while True:
+        line=input("enter your goal (blank to quit): ").strip()
+        if not line:
+            return
+        path=jugs.path(int(line))
+        if path is None:
+            print("NO Way of doing so.")
+            continue
+        print("\t".join(f"Jug{i+1}(max:{c})" for i,c in enumerate(capacities))+"\tRule Applied")
+        print("\t\t".join("0" for _ in capacities)+"\t\tintial state")
+        for levels,rule in path:
+            print("\t\t".join(map(str,levels))+f"\t\t{describe(rule)}")
+
+
 def main():
+    if "--jugs" in sys.argv:
+        many_jugs()
+        return
     mw1=int(input("enter the max water in smaller Jug: "))
     mw2=int(input("enter the max water in larger Jug: "))
     goal=int(input("enter your goal: "))
@@ -105,7 +265,13 @@ def main():
     jug2=Jug(0,max(mw1,mw2))
     state=(jug1,jug2)
 
-    path=path_find(state,goal)
+    path=pour_path(state,goal)
+    if "--verify" in sys.argv:
+        searched=bfs_path(state,goal)
+        if (searched is None)!=(path is None) or (path and len(searched)!=len(path)):
+            print("Verification with BFS failed")
+        else:
+            print("Verified with BFS")
 
     rules={1:"fill jug 1",
         2:"fill jug 2",
@@ -116,7 +282,7 @@ def main():
         7:"pour all water from jug 1 to jug 2",
         8:"pour all water from jug 2 to jug 1"
         }
-    if not path:
+    if path is None:
         print("NO Way of doing so.")
     else:
         print(f"Jug1(max:{jug1.maxWater})\tJug2(max:{jug2.maxWater})\tRule Applied")
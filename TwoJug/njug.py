@@ -0,0 +1,104 @@
+from collections import deque
+from functools import lru_cache
+from math import gcd
+
+
+class JugSet():
+    def __init__(self,capacities:tuple[int,...]):
+        """
+        Runs a single breadth first search from all jugs empty and records, for every
+        volume that can be measured, the shortest sequence of rules leaving it in some jug.
+
+        A rule is `("fill", i)`, `("empty", i)` or `("pour", i, j)`; pouring stops when
+        jug `i` is empty or jug `j` is full. States are water levels encoded in mixed radix
+        so the search only stores one int per reached state.
+        """
+        self.capacities=tuple(capacities)
+        self.radix=[]
+        place=1
+        for capacity in self.capacities:
+            self.radix.append(place)
+            place*=capacity+1
+
+        self.parent:dict[int,tuple[int,tuple]]={}
+        # table[volume] is the first state found with that volume in some jug
+        self.table:dict[int,int]={0:0}
+        self.search()
+
+    def encode(self,levels:list[int]) -> int:
+        return sum(level*place for level,place in zip(levels,self.radix))
+
+    def decode(self,state:int) -> list[int]:
+        return [(state//place)%(capacity+1) for place,capacity in zip(self.radix,self.capacities)]
+
+    def measurable(self) -> set[int]:
+        """Every volume some jug can end up holding"""
+        g=0
+        for capacity in self.capacities:
+            g=gcd(g,capacity)
+        if g==0:
+            return {0}
+        return set(range(0,max(self.capacities)+1,g))
+
+    def moves(self,levels:list[int]):
+        """Yields `(rule, new levels)` for every rule that changes `levels`"""
+        for i,capacity in enumerate(self.capacities):
+            if levels[i]<capacity:
+                new=levels.copy()
+                new[i]=capacity
+                yield ("fill",i),new
+            if levels[i]>0:
+                new=levels.copy()
+                new[i]=0
+                yield ("empty",i),new
+                for j,other in enumerate(self.capacities):
+                    if j!=i and levels[j]<other:
+                        amount=min(levels[i],other-levels[j])
+                        new=levels.copy()
+                        new[i]-=amount
+                        new[j]+=amount
+                        yield ("pour",i,j),new
+
+    def search(self):
+        """Breadth first search, stops early once every measurable volume has been found"""
+        wanted=self.measurable()
+        queue=deque([0])
+        self.parent[0]=(-1,())
+        while queue and len(self.table)<len(wanted):
+            state=queue.popleft()
+            for rule,levels in self.moves(self.decode(state)):
+                child=self.encode(levels)
+                if child in self.parent:
+                    continue
+                self.parent[child]=(state,rule)
+                for level in levels:
+                    if level not in self.table:
+                        self.table[level]=child
+                queue.append(child)
+
+    def path(self,goal:int) -> list[tuple[list[int],tuple]] | None:
+        """Shortest `(levels, rule)` steps leaving `goal` in some jug, None if impossible"""
+        if goal not in self.table:
+            return None
+        state=self.table[goal]
+        path=[]
+        while state!=0:
+            parent,rule=self.parent[state]
+            path.append((self.decode(state),rule))
+            state=parent
+        path.reverse()
+        return path
+
+
+@lru_cache(maxsize=None)
+def jug_set(capacities:tuple[int,...]) -> JugSet:
+    """Reachability tables are cached per capacity tuple"""
+    return JugSet(capacities)
+
+
+def describe(rule:tuple) -> str:
+    if rule[0]=="fill":
+        return f"fill jug {rule[1]+1}"
+    if rule[0]=="empty":
+        return f"empty jug {rule[1]+1}"
+    return f"pour water from jug {rule[1]+1} to jug {rule[2]+1}"
@@ -1,5 +1,5 @@
 import sys
-import copy
+from collections import deque
 from crossword import *
 
 
@@ -8,13 +8,46 @@ class CrosswordCreator():
     def __init__(self, crossword:Crossword):
         """
         Create new CSP crossword generate.
+
+        Domains are bitsets over `self.words`: bit k of `self.domains[var]`
+        is set while `self.words[k]` is a possible value of `var`.
+        `self.index[length][position][letter]` is the bitset of the words
+        of that length with that letter at that position.
         """
         self.crossword = crossword
+        self.words = sorted(self.crossword.words)
+        self.bit = {word: 1 << k for k, word in enumerate(self.words)}
+        self.lengths = {}
+        self.index = {}
+        for word, bit in self.bit.items():
+            self.lengths[len(word)] = self.lengths.get(len(word), 0) | bit
+            positions = self.index.setdefault(len(word), [{} for _ in word])
+            for position, letter in enumerate(word):
+                positions[position][letter] = positions[position].get(letter, 0) | bit
+
+        everything = (1 << len(self.words)) - 1
         self.domains = {
-            var: self.crossword.words.copy()
+            var: everything
             for var in self.crossword.variables
         }
 
+        # AC-3 counters for profiling: arcs taken off the worklist, revisions
+        # that removed something and words removed by them
+        self.arcs_processed = 0
+        self.revisions = 0
+        self.values_pruned = 0
+
+    def values(self, domain):
+        """
+        Return the words in the bitset `domain`.
+        """
+        words = []
+        while domain:
+            low = domain & -domain
+            words.append(self.words[low.bit_length() - 1])
+            domain ^= low
+        return words
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -100,11 +133,7 @@ class CrosswordCreator():
          constraints; in this case, the length of the word.)
         """
         for var in self.domains:
-            dm=self.domains[var].copy()
-            for word in self.domains[var]:
-                if var.length !=len(word):
-                    dm.remove(word)
-            self.domains[var]=dm
+            self.domains[var] &= self.lengths.get(var.length, 0)
 
     def conflict(self, x, y, wordX, wordY):
         """
@@ -124,13 +153,31 @@ class CrosswordCreator():
 
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
+
+        A word of `x` is supported when its letter at the overlap is the
+        letter at the overlap of some word left for `y`, so the supported
+        words are the union, over the letters found in `y`'s domain at
+        its overlap position, of `x`'s words with that letter.
         """
-        revised=False
-        for wordx in self.domains[x].copy():
-            if all(self.conflict(x,y,wordx,wordy) for wordy in self.domains[y]):
-                self.domains[x].remove(wordx)
-                revised=True
-        return revised
+        overlap = self.crossword.overlaps[x, y]
+        if overlap is None:
+            return False
+        i, j = overlap
+        xs = self.index.get(x.length)
+        ys = self.index.get(y.length)
+        domain = self.domains[y]
+        supported = 0
+        if xs is not None and ys is not None:
+            for letter, words in ys[j].items():
+                if domain & words:
+                    supported |= xs[i].get(letter, 0)
+        revised = self.domains[x] & ~supported
+        if not revised:
+            return False
+        self.domains[x] &= supported
+        self.revisions += 1
+        self.values_pruned += revised.bit_count()
+        return True
 
 
     def ac3(self, arcs=None):
@@ -141,6 +188,8 @@ class CrosswordCreator():
 
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
+
+        Arcs wait in a FIFO queue and an arc already waiting is not queued again.
         """
         if arcs==None:
             arcs=[]
@@ -148,14 +197,23 @@ class CrosswordCreator():
                 for y in self.crossword.neighbors(x):
                     if self.crossword.overlaps[x,y]:
                         arcs.append((x,y))
-        while arcs:
-            x,y=arcs.pop(0)
+        queue=deque()
+        queued=set()
+        for arc in arcs:
+            if arc not in queued:
+                queue.append(arc)
+                queued.add(arc)
+        while queue:
+            x,y=queue.popleft()
+            queued.remove((x,y))
+            self.arcs_processed+=1
             if self.revise(x,y):
                 if not self.domains[x]:
                     return False
                 for z in self.crossword.neighbors(x):
-                    if z!=y:
-                        arcs.append((z,x))
+                    if z!=y and (z,x) not in queued:
+                        queue.append((z,x))
+                        queued.add((z,x))
         return True
 
     def assignment_complete(self, assignment):
@@ -200,10 +258,10 @@ class CrosswordCreator():
             return sum(
                 1 for neighbor in neighbors
                 if neighbor not in assignment
-                and word in self.domains[neighbor]
+                and self.domains[neighbor] & self.bit[word]
             )
 
-        return sorted(self.domains[var], key=elimination_count)
+        return sorted(self.values(self.domains[var]), key=elimination_count)
 
 
     def select_unassigned_variable(self, assignment):
@@ -217,7 +275,7 @@ class CrosswordCreator():
         res=[i for i in self.crossword.variables if i not in assignment]
         def sortby(x):
             # list will be sorted by ascending order of len(domains) and desc wrt number of neighbours
-            return(len(self.domains[x]),-len(self.crossword.neighbors(x)))
+            return(self.domains[x].bit_count(),-len(self.crossword.neighbors(x)))
         res.sort(key=sortby)
         return res[0]
 
@@ -240,8 +298,8 @@ class CrosswordCreator():
 
         if maintain_arc_consistency(x):
             for var, values in self.domains.items():
-                if len(values) == 1:
-                    value = list(values)[0]
+                if values.bit_count() == 1:
+                    value = self.words[values.bit_length() - 1]
                     if value not in assignment.values():
                         assignment[var] = value
             return True
@@ -260,9 +318,9 @@ class CrosswordCreator():
             return assignment
         var=self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var,assignment):
-            restore = assignment.copy(), copy.deepcopy(self.domains)
+            restore = assignment.copy(), self.domains.copy()
             if self.consistent(assignment | {var: value}):
-                assignment[var], self.domains[var] = value, {value}
+                assignment[var], self.domains[var] = value, self.bit[value]
                 inferences = self.inference(var, assignment)
                 if not inferences:
                     return None
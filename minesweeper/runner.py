@@ -1,6 +1,7 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from minesweeper import Minesweeper, MinesweeperAI
 
@@ -49,6 +50,27 @@ lost = False
 # Show instructions initially
 instructions = True
 
+# The AI updates its knowledge and picks moves in a background thread, one
+# job at a time in the order they were given, while the window keeps drawing
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+knowledge_future = None
+
+
+def choose_move(ai):
+    """Returns the AI's next move and the mines it knows of"""
+    move = ai.make_safe_move()
+    if move is None:
+        move = ai.make_random_move()
+        if move is None:
+            print("No moves left to make.")
+        else:
+            print("No known safe moves, AI making random move.")
+    else:
+        print("AI making safe move.")
+    return move, ai.mines.copy()
+
+
 while True:
 
     # Check if game quit
@@ -153,7 +175,12 @@ while True:
     screen.blit(buttonText, buttonRect)
 
     # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    thinking = (ai_future is not None
+                or (knowledge_future is not None and not knowledge_future.done()))
+    if thinking:
+        text = "Thinking" + "." * (int(time.time() * 2) % 4)
+    else:
+        text = "Lost" if lost else "Won" if game.mines == flags else ""
     text = mediumFont.render(text, True, WHITE)
     textRect = text.get_rect()
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
@@ -178,22 +205,19 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, ask the AI for a move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if ai_future is None:
+                ai_future = executor.submit(choose_move, ai)
             time.sleep(0.2)
 
         # Reset game state
         elif resetButton.collidepoint(mouse):
+            # Work still queued for the old AI is dropped, a job already running finishes unused
+            for future in (ai_future, knowledge_future):
+                if future is not None:
+                    future.cancel()
+            ai_future = knowledge_future = None
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
             ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()
@@ -201,8 +225,8 @@ while True:
             lost = False
             continue
 
-        # User-made move
-        elif not lost:
+        # User-made move, once the AI has finished its own
+        elif not lost and ai_future is None:
             for i in range(HEIGHT):
                 for j in range(WIDTH):
                     if (cells[i][j].collidepoint(mouse)
@@ -210,6 +234,13 @@ while True:
                             and (i, j) not in revealed):
                         move = (i, j)
 
+    # Collect the AI's move once it has been worked out
+    if ai_future is not None and ai_future.done() and move is None:
+        move, mines = ai_future.result()
+        ai_future = None
+        if move is None:
+            flags = mines
+
     # Make move and update AI knowledge
     if move:
         if game.is_mine(move):
@@ -217,6 +248,6 @@ while True:
         else:
             nearby = game.nearby_mines(move)
             revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            knowledge_future = executor.submit(ai.add_knowledge, move, nearby)
 
     pygame.display.flip()
@@ -5,29 +5,34 @@ import time
 
 class Nim():
 
-    def __init__(self, initial=[1, 3, 5, 7]):
+    def __init__(self, initial=[1, 3, 5, 7], max_take=None):
         """
         Initialize game board.
         Each game board has
             - `piles`: a list of how many elements remain in each pile
             - `player`: 0 or 1 to indicate which player's turn
             - `winner`: None, 0, or 1 to indicate who the winner is
+            - `max_take`: the most objects a move may take, None for no limit
         """
         self.piles = initial.copy()
+        self.max_take = max_take
         self.player = 0
         self.winner = None
 
     @classmethod
-    def available_actions(cls, piles):
+    def available_actions(cls, piles, max_take=None):
         """
         Nim.available_actions(piles) takes a `piles` list as input
         and returns all of the available actions `(i, j)` in that state.
 
         Action `(i, j)` represents the action of removing `j` items
-        from pile `i` (where piles are 0-indexed).
+        from pile `i` (where piles are 0-indexed). With `max_take`
+        at most that many items may be removed.
         """
         actions = set()
         for i, pile in enumerate(piles):
+            if max_take is not None:
+                pile = min(pile, max_take)
             for j in range(1, pile + 1):
                 actions.add((i, j))
         return actions
@@ -60,6 +65,8 @@ class Nim():
             raise Exception("Invalid pile")
         elif count < 1 or count > self.piles[pile]:
             raise Exception("Invalid number of objects")
+        elif self.max_take is not None and count > self.max_take:
+            raise Exception("Too many objects")
 
         # Update pile
         self.piles[pile] -= count
@@ -169,17 +176,104 @@ class NimAI():
             return random.choice(list(actions))
 
 
-def train(n):
+class OptimalNimAI():
+
+    def __init__(self, epsilon=0):
+        """
+        Initialize a player that plays perfect misère Nim, where the player
+        taking the last object loses, without any training. With
+        probability `epsilon` it makes a random move instead, if asked to.
+        """
+        self.epsilon = epsilon
+
+    @classmethod
+    def is_winning(cls, piles):
+        """
+        Returns True if the player to move in `piles` can force a win.
+
+        In misère Nim this is the case when the XOR of the piles (the
+        nim-sum) is not 0, except when every pile holds at most one
+        object, where the player to move wins on an even number of piles.
+        """
+        if all(pile <= 1 for pile in piles):
+            return sum(piles) % 2 == 0
+        nim_sum = 0
+        for pile in piles:
+            nim_sum ^= pile
+        return nim_sum != 0
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state `state`, return an action `(i, j)` to take.
+
+        The winning move is found in one pass over the piles: play as in
+        normal Nim, emptying the nim-sum, unless that would leave no pile
+        above one, in which case leave an odd number of piles of one.
+        In a losing position one object is taken from the largest pile.
+        """
+        if epsilon and random.random() < self.epsilon:
+            return random.choice(list(Nim.available_actions(state)))
+
+        big = [i for i, pile in enumerate(state) if pile > 1]
+        ones = sum(1 for pile in state if pile == 1)
+        largest = max(range(len(state)), key=lambda i: state[i])
+
+        if len(big) == 1:
+            # Take the big pile down to 0 or 1, whichever leaves an odd number of ones
+            i = big[0]
+            return (i, state[i] if ones % 2 == 1 else state[i] - 1)
+
+        nim_sum = 0
+        for pile in state:
+            nim_sum ^= pile
+        if big and nim_sum:
+            for i, pile in enumerate(state):
+                if pile ^ nim_sum < pile:
+                    return (i, pile - (pile ^ nim_sum))
+        return (largest, 1)
+
+
+def accuracy(ai, initial=[1, 3, 5, 7]):
+    """
+    Returns the fraction of winning positions reachable from `initial`
+    in which `ai.choose_action(piles, epsilon=False)` picks a winning
+    move, i.e. one leaving the other player in a losing position.
+    """
+    states = [[]]
+    for size in initial:
+        states = [state + [pile] for state in states for pile in range(size + 1)]
+
+    winning = correct = 0
+    for piles in states:
+        if not any(piles) or not OptimalNimAI.is_winning(piles):
+            continue
+        winning += 1
+        i, j = ai.choose_action(piles, epsilon=False)
+        after = piles.copy()
+        after[i] -= j
+        # Emptying the board loses, otherwise the move must leave a losing position
+        if any(after) and not OptimalNimAI.is_winning(after):
+            correct += 1
+    return correct / winning
+
+
+def train(n, player=None, initial=[1, 3, 5, 7], progress=1000):
     """
-    Train an AI by playing `n` games against itself.
+    Train an AI by playing `n` games against itself, starting from the
+    `initial` piles. A new `NimAI` is trained unless `player` is given.
+    Progress and games per second are printed every `progress` games.
     """
 
-    player = NimAI()
+    if player is None:
+        player = NimAI()
 
     # Play n games
+    start = time.perf_counter()
     for i in range(n):
-        print(f"Playing training game {i + 1}")
-        game = Nim()
+        if progress and i and i % progress == 0:
+            rate = i / (time.perf_counter() - start)
+            print(f"Played {i} training games, {rate:.0f} games/sec")
+        game = Nim(initial)
 
         # Keep track of last move made by either player
         last = {
@@ -222,15 +316,17 @@ def train(n):
                     0
                 )
 
-    print("Done training")
+    rate = n / (time.perf_counter() - start) if n else 0
+    print(f"Done training, {n} games at {rate:.0f} games/sec")
 
     # Return the trained AI
     return player
 
 
-def play(ai, human_player=None):
+def play(ai, human_player=None, initial=[1, 3, 5, 7], max_take=None):
     """
-    Play human game against the AI.
+    Play human game against the AI, starting from the `initial` piles,
+    where a move takes at most `max_take` objects.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
     """
@@ -240,7 +336,7 @@ def play(ai, human_player=None):
         human_player = random.randint(0, 1)
 
     # Create new game
-    game = Nim()
+    game = Nim(initial, max_take)
 
     # Game loop
     while True:
@@ -253,7 +349,7 @@ def play(ai, human_player=None):
         print()
 
         # Compute available actions
-        available_actions = Nim.available_actions(game.piles)
+        available_actions = Nim.available_actions(game.piles, game.max_take)
         time.sleep(1)
 
         # Let human make a move
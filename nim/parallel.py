@@ -0,0 +1,99 @@
+#Trains a Nim Q-table with self-play spread across a pool of worker processes.
+#The master table and one table per worker live in a single shared memory block, so tables are never pickled.
+#Each round every worker copies the master table, plays its share of games with `qtable.train_batch`
+#and writes its table back; the master then becomes the average of the worker tables.
+#Worker w in round r is seeded from (seed, r, w), so a run is reproducible whatever order workers finish in.
+
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from qtable import ArrayNimAI, train_batch
+from solver import NimSolver
+
+
+def train_job(job):
+    """Worker entry point, trains a copy of the master table into the worker's slot"""
+    name, shape, slot, initial, alpha, epsilon, max_take, games, batch, seed = job
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        tables = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        player = ArrayNimAI(initial, alpha, epsilon, max_take)
+        player.q = tables[0].copy()
+        train_batch(games, player, initial, batch=batch, progress=0, seed=seed)
+        tables[slot] = player.q
+        del tables
+    finally:
+        block.close()
+    return slot
+
+
+def train_parallel(n, player=None, initial=[1, 3, 5, 7], workers=None, rounds=10, batch=64, seed=0):
+    """
+    Train an `ArrayNimAI` on `n` games of self-play split evenly over
+    `workers` processes and `rounds` merges, and return it.
+    """
+    if player is None:
+        player = ArrayNimAI(initial)
+    workers = workers or os.cpu_count()
+    shape = (workers + 1, *player.q.shape)
+    block = shared_memory.SharedMemory(create=True, size=8 * int(np.prod(shape)))
+    try:
+        tables = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        tables[0] = player.q
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        clock = time.perf_counter()
+        played = 0
+        with context.Pool(workers) as pool:
+            for r in range(rounds):
+                jobs = []
+                for w in range(workers):
+                    # the games are cut into rounds * workers shares adding up to exactly n
+                    share = r * workers + w
+                    games = n * (share + 1) // (rounds * workers) - n * share // (rounds * workers)
+                    jobs.append((block.name, shape, w + 1, player.initial, player.alpha, player.epsilon, player.max_take,
+                                 games, batch, np.random.SeedSequence([seed, r, w])))
+                    played += games
+                for _ in pool.imap_unordered(train_job, jobs):
+                    pass
+                tables[0] = tables[1:].mean(axis=0)
+                rate = played / (time.perf_counter() - clock)
+                print(f"Round {r + 1}/{rounds}: played {played} training games, {rate:.0f} games/sec")
+
+        player.q = tables[0].copy()
+        player.games += played
+        del tables
+    finally:
+        block.close()
+        block.unlink()
+    return player
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel Nim self-play training")
+    parser.add_argument("games", type=int, help="number of training games")
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7], help="initial pile sizes")
+    parser.add_argument("--max-take", type=int, help="most objects a move may take")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--rounds", type=int, default=10, help="number of times worker tables are merged")
+    parser.add_argument("--batch", type=int, default=64, help="games each worker plays in lockstep")
+    parser.add_argument("--seed", type=int, default=0, help="seed the workers' seeds are derived from")
+    parser.add_argument("--save", metavar="FILE", help="save the trained Q-table snapshot to FILE")
+    args = parser.parse_args()
+
+    player = train_parallel(args.games, ArrayNimAI(args.piles, max_take=args.max_take), args.piles, workers=args.workers,
+                            rounds=args.rounds, batch=args.batch, seed=args.seed)
+    solver = NimSolver(args.piles, args.max_take)
+    print(f"Winning moves found in {solver.accuracy(player):.1%} of winning positions")
+    if args.save:
+        player.save(args.save)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,55 @@
-from nim import train, play
+import argparse
+import os
 
-ai = train(10000)
-play(ai)
+from nim import OptimalNimAI, accuracy, train, play
+
+parser = argparse.ArgumentParser(description="Play Nim against the AI")
+parser.add_argument("--optimal", action="store_true",
+                    help="play against the perfect player instead of training one")
+parser.add_argument("--batch", action="store_true",
+                    help="train with many games in lockstep on a NumPy Q-table")
+parser.add_argument("--piles", type=int, nargs="+",
+                    help="initial pile sizes, 1 3 5 7 unless a snapshot says otherwise")
+parser.add_argument("--snapshot", metavar="FILE",
+                    help="play from the Q-table saved in FILE, training and saving it first if missing")
+parser.add_argument("--resume", type=int, metavar="N", default=0,
+                    help="train N more games from the snapshot, or N games if it is missing, and save it before playing")
+parser.add_argument("--score", action="store_true",
+                    help="print how often the trained AI picks a winning move, then play")
+args = parser.parse_args()
+
+if args.resume and not args.snapshot:
+    parser.error("--resume needs --snapshot")
+
+piles = args.piles or [1, 3, 5, 7]
+max_take = None
+if args.optimal:
+    ai = OptimalNimAI()
+elif args.snapshot:
+    from qtable import ArrayNimAI, train_batch
+    if not os.path.exists(args.snapshot):
+        if args.resume:
+            ai = train_batch(args.resume, ArrayNimAI(piles), piles, progress=10000)
+        else:
+            ai = train_batch(200000, ArrayNimAI(piles), piles, progress=10000, patience=3, tolerance=0.1)
+        ai.save(args.snapshot)
+    elif args.resume:
+        ai = ArrayNimAI.load(args.snapshot, writable=True)
+        train_batch(args.resume, ai, ai.initial).save(args.snapshot)
+    ai = ArrayNimAI.load(args.snapshot)
+    if args.piles and args.piles != ai.initial:
+        parser.error(f"{args.snapshot} was trained on piles {' '.join(map(str, ai.initial))}")
+    piles, max_take = ai.initial, ai.max_take
+elif args.batch:
+    from qtable import ArrayNimAI, train_batch
+    ai = train_batch(200000, ArrayNimAI(piles), piles, progress=10000, patience=3, tolerance=0.1)
+else:
+    ai = train(10000, initial=piles)
+if args.score:
+    if max_take is None:
+        score = accuracy(ai, piles)
+    else:
+        from solver import NimSolver
+        score = NimSolver(piles, max_take).accuracy(ai)
+    print(f"Winning moves found in {score:.1%} of winning positions")
+play(ai, initial=piles, max_take=max_take)
@@ -0,0 +1,308 @@
+import os
+import random
+import struct
+import time
+
+import numpy as np
+
+from nim import Nim, NimAI
+
+# Snapshot header: magic, version, number of piles, the most objects a move
+# may take (0 for no limit, from version 2), then one unsigned short per
+# initial pile and the alpha, epsilon and games trained. The Q-table
+# follows as little endian float64, starting on an 8 byte boundary.
+MAGIC = b"NIMQ"
+VERSION = 2
+HEADER = struct.Struct("<4sHH")
+LIMIT = struct.Struct("<H")
+SETTINGS = struct.Struct("<ddQ")
+
+
+class ArrayNimAI(NimAI):
+
+    def __init__(self, initial=[1, 3, 5, 7], alpha=0.5, epsilon=0.1, max_take=None):
+        """
+        Initialize AI with a dense Q-table covering every state reachable
+        from the `initial` piles, an alpha (learning) rate, and an epsilon
+        rate, for the game where a move takes at most `max_take` objects.
+
+        `self.q[s, a]` is the Q-value of taking action `a` in state `s`:
+         - state `s` encodes piles in mixed radix, pile `i` being worth
+           `self.place[i]`, so `s = sum(pile * place)`
+         - action `a` is a flat index over `(i, j)`, actions on pile `i`
+           starting at `self.offset[i]`
+
+        `self.legal[s, a]` masks out the actions taking more objects than
+        the pile holds, and `self.penalty[s, a]` is -inf there and 0
+        elsewhere so that a max over `q + penalty` only sees legal actions.
+        """
+        self.initial = list(initial)
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.max_take = max_take
+
+        self.place = []
+        self.offset = []
+        self.actions = []
+        place, offset = 1, 0
+        for i, size in enumerate(self.initial):
+            self.place.append(place)
+            self.offset.append(offset)
+            takes = size if max_take is None else min(size, max_take)
+            self.actions.extend((i, j) for j in range(1, takes + 1))
+            place *= size + 1
+            offset += takes
+        self.states = place
+
+        piles = self.decode(np.arange(self.states))
+        pile = np.array([i for i, _ in self.actions], dtype=np.int64)
+        count = np.array([j for _, j in self.actions], dtype=np.int64)
+        self.legal = piles[:, pile] >= count
+        self.penalty = np.where(self.legal, 0.0, -np.inf)
+        self.q = np.zeros((self.states, len(self.actions)))
+        self.games = 0
+
+    @classmethod
+    def from_dict(cls, ai, initial=[1, 3, 5, 7], max_take=None):
+        """
+        Returns an `ArrayNimAI` holding the Q-values of a dict based `NimAI`
+        trained on the game where a move takes at most `max_take` objects.
+        """
+        player = cls(initial, ai.alpha, ai.epsilon, max_take)
+        for (state, action), value in ai.q.items():
+            player.q[player.encode(state), player.action_index(action)] = value
+        return player
+
+    def save(self, path):
+        """
+        Write the Q-table and the settings it was trained with to `path`.
+        """
+        header = HEADER.pack(MAGIC, VERSION, len(self.initial))
+        header += LIMIT.pack(self.max_take or 0)
+        header += struct.pack(f"<{len(self.initial)}H", *self.initial)
+        header += SETTINGS.pack(self.alpha, self.epsilon, self.games)
+        header += bytes(-len(header) % 8)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(np.ascontiguousarray(self.q, dtype="<f8").tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, writable=False):
+        """
+        Read a snapshot written by `save`. Unless `writable`, the Q-table
+        is memory mapped read-only, which is enough to play; pass
+        `writable=True` to keep training from the snapshot.
+        """
+        with open(path, "rb") as f:
+            magic, version, piles = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version not in (1, VERSION):
+                raise ValueError(f"{path} is not a Nim Q-table snapshot")
+            max_take = LIMIT.unpack(f.read(LIMIT.size))[0] if version >= 2 else 0
+            initial = struct.unpack(f"<{piles}H", f.read(2 * piles))
+            alpha, epsilon, games = SETTINGS.unpack(f.read(SETTINGS.size))
+            offset = f.tell()
+        offset += -offset % 8
+
+        player = cls(initial, alpha, epsilon, max_take or None)
+        player.games = games
+        shape = player.q.shape
+        if os.path.getsize(path) != offset + 8 * shape[0] * shape[1]:
+            raise ValueError(f"{path} is truncated")
+        if writable:
+            player.q = np.fromfile(path, dtype="<f8", offset=offset).reshape(shape)
+        else:
+            player.q = np.memmap(path, dtype="<f8", mode="r", offset=offset, shape=shape)
+        return player
+
+    def encode(self, state):
+        """Returns the index of the piles `state`"""
+        return sum(pile * place for pile, place in zip(state, self.place))
+
+    def decode(self, index):
+        """Returns the piles of the state indices in the array `index`, one row per state"""
+        sizes = np.array(self.initial) + 1
+        return (np.asarray(index)[..., None] // np.array(self.place)) % sizes
+
+    def action_index(self, action):
+        i, j = action
+        return self.offset[i] + j - 1
+
+    def get_q_value(self, state, action):
+        """
+        Return the Q-value for the state `state` and the action `action`.
+        """
+        return self.q[self.encode(state), self.action_index(action)]
+
+    def update(self, old_state, action, new_state, reward):
+        """
+        Update Q-learning model, given an old state, an action taken
+        in that state, a new resulting state, and the reward received
+        from taking that action.
+        """
+        s, a = self.encode(old_state), self.action_index(action)
+        old = self.q[s, a]
+        future = self.best_future_rewards(self.encode(new_state))
+        self.q[s, a] = old + self.alpha * (reward + future - old)
+
+    def update_q_value(self, state, action, old_q, reward, future_rewards):
+        """
+        Update the Q-value for the state `state` and the action `action`
+        with the same formula as `NimAI.update_q_value`.
+        """
+        self.q[self.encode(state), self.action_index(action)] = old_q + self.alpha * (reward + future_rewards - old_q)
+
+    def best_future_rewards(self, states):
+        """
+        Returns, for each state index in the array `states`, the highest
+        Q-value of a legal action, or 0 where there is none.
+        """
+        # only the empty state, index 0, has no legal actions
+        best = (self.q[states] + self.penalty[states]).max(axis=-1)
+        return np.where(states == 0, 0.0, best)
+
+    def best_future_reward(self, state):
+        """
+        Given a state `state`, return the highest Q-value of an
+        available action, or 0 if there are no available actions.
+        """
+        return float(self.best_future_rewards(self.encode(state)))
+
+    def update_many(self, states, actions, new_states, rewards):
+        """
+        Vectorized `update` over arrays of state indices, action indices,
+        new state indices and rewards.
+
+        A `(state, action)` pair appearing `c` times gets all `c` updates,
+        as if applied one after another in array order: with targets
+        `t_1 .. t_c` and `d = 1 - alpha` that is
+        `q <- d**c * q + sum(alpha * d**(c - k) * t_k)`.
+        """
+        target = rewards + self.best_future_rewards(new_states)
+        keys = states * self.q.shape[1] + actions
+        unique, group, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        # rank of each update within its group, in array order
+        order = np.argsort(group, kind="stable")
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[order] = np.arange(len(keys)) - np.repeat(np.cumsum(counts) - counts, counts)
+        decay = 1 - self.alpha
+        total = np.zeros(len(unique))
+        np.add.at(total, group, self.alpha * decay ** (counts[group] - 1 - rank) * target)
+        s, a = np.divmod(unique, self.q.shape[1])
+        self.q[s, a] = decay ** counts * self.q[s, a] + total
+
+    def greedy(self, states):
+        """Returns the best legal action index for each state index in the array `states`"""
+        return (self.q[states] + self.penalty[states]).argmax(axis=-1)
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Given a state `state`, return an action `(i, j)` to take.
+
+        If `epsilon` is `True`, then with probability `self.epsilon`
+        choose a random available action, otherwise choose the available
+        action with the highest Q-value.
+        """
+        if epsilon and random.random() < self.epsilon:
+            return random.choice(list(Nim.available_actions(state, self.max_take)))
+        return self.actions[int(self.greedy(self.encode(state)))]
+
+
+def train_batch(n, player=None, initial=[1, 3, 5, 7], batch=64, progress=100000, patience=None, tolerance=0.0, check=10000, seed=None):
+    """
+    Train an `ArrayNimAI` on `n` games of self-play, starting from the
+    `initial` piles, by playing `batch` games in lockstep as arrays and
+    applying each step's Q-value updates to all of them at once.
+    A finished game is replaced with a new one until `n` have started.
+
+    Every `progress` games the number of games played and games per second
+    are printed, `progress=0` trains silently. With `patience`, the greedy
+    policy is compared every `check` games, whether or not anything is
+    printed, and training stops early once, for `patience` checks in a
+    row, the greedy action has changed since the previous check in at
+    most a `tolerance` fraction of the states.
+    Exploration keeps moving Q-values between equally good actions, so a
+    small tolerance (e.g. 0.1) is needed for this to happen.
+    """
+    if player is None:
+        player = ArrayNimAI(initial)
+    rng = np.random.default_rng(seed)
+    start = player.encode(initial)
+    delta = np.array([j * player.place[i] for i, j in player.actions])
+
+    size = min(batch, n)
+    state = np.full(size, start)
+    turn = np.zeros(size, dtype=np.int64)
+    # last_state[p, g] and last_action[p, g] are player p's last move in game g, -1 before it has one
+    last_state = np.full((2, size), -1)
+    last_action = np.full((2, size), -1)
+    games = np.arange(size)
+    started = size
+    finished = 0
+    reported = 0
+    checked = 0
+    policy = None
+    unchanged = 0
+    clock = time.perf_counter()
+
+    while len(games):
+        s = state[games]
+        p = turn[games]
+        other = 1 - p
+
+        # Epsilon-greedy: a random legal action is the argmax of random noise over the legal actions
+        explore = rng.random(len(games)) < player.epsilon
+        noise = rng.random((len(games), len(player.actions))) + player.penalty[s]
+        action = np.where(explore, noise.argmax(axis=1), player.greedy(s))
+        new = s - delta[action]
+        last_state[p, games] = s
+        last_action[p, games] = action
+
+        over = new == 0
+        previous = last_state[other, games] >= 0
+        player.update_many(s[over], action[over], new[over], np.full(over.sum(), -1.0))
+        rewarded = over & previous
+        player.update_many(last_state[other[rewarded], games[rewarded]], last_action[other[rewarded], games[rewarded]],
+                           new[rewarded], np.full(rewarded.sum(), 1.0))
+        waiting = ~over & previous
+        player.update_many(last_state[other[waiting], games[waiting]], last_action[other[waiting], games[waiting]],
+                           new[waiting], np.zeros(waiting.sum()))
+
+        state[games] = new
+        turn[games] = other
+
+        # Replace finished games with new ones while there are games left to start
+        done = games[over]
+        finished += len(done)
+        restart = done[:max(0, n - started)]
+        started += len(restart)
+        state[restart] = start
+        turn[restart] = 0
+        last_state[:, restart] = -1
+        last_action[:, restart] = -1
+        games = np.concatenate([games[~over], restart])
+
+        if progress and finished - reported >= progress:
+            reported = finished - finished % progress
+            rate = finished / (time.perf_counter() - clock)
+            print(f"Played {finished} training games, {rate:.0f} games/sec")
+
+        if patience is not None and finished - checked >= check:
+            checked = finished - finished % check
+            greedy = player.greedy(np.arange(1, player.states))
+            if policy is not None and (greedy != policy).mean() <= tolerance:
+                unchanged += 1
+                if unchanged >= patience:
+                    if progress:
+                        print(f"Greedy policy converged after {finished} games")
+                    break
+            else:
+                unchanged = 0
+            policy = greedy
+
+    player.games += finished
+    if progress:
+        rate = finished / (time.perf_counter() - clock)
+        print(f"Done training, {finished} games at {rate:.0f} games/sec")
+    return player
@@ -0,0 +1,121 @@
+import argparse
+
+import numpy as np
+
+from qtable import ArrayNimAI, train_batch
+
+
+class NimSolver():
+
+    def __init__(self, initial=[1, 3, 5, 7], max_take=None, misere=True):
+        """
+        Solve every position reachable from the `initial` piles by
+        retrograde analysis, for the game where a move takes at most
+        `max_take` objects from one pile. With `misere` the player taking
+        the last object loses, as in `Nim`; otherwise they win.
+
+        States and actions are indexed like `ArrayNimAI`:
+         - `self.win[s]` is True if the player to move in state `s` can force a win
+         - `self.policy[s]` is the index of a winning action in `s`, or -1 if `s` is lost
+        """
+        self.initial = list(initial)
+        self.max_take = max_take
+        self.misere = misere
+        # the table layout is borrowed from an empty Q-table
+        self.layout = ArrayNimAI(initial, max_take=max_take)
+        self.actions = self.layout.actions
+        self.solve()
+
+    def solve(self):
+        """
+        Every move lowers the number of objects left, so states are labelled
+        one level at a time, from the empty board up. A state is won if some
+        legal move leads to a lost state.
+        """
+        layout = self.layout
+        states = np.arange(layout.states)
+        piles = layout.decode(states)
+        level = piles.sum(axis=1)
+        delta = np.array([j * layout.place[i] for i, j in self.actions])
+
+        self.win = np.zeros(layout.states, dtype=bool)
+        self.policy = np.full(layout.states, -1)
+        # On the empty board the previous player took the last object
+        self.win[0] = self.misere
+
+        for total in range(1, level.max() + 1):
+            s = states[level == total]
+            nxt = s[:, None] - delta
+            winning = layout.legal[s] & ~self.win[np.where(layout.legal[s], nxt, 0)]
+            found = winning.any(axis=1)
+            self.win[s] = found
+            self.policy[s] = np.where(found, winning.argmax(axis=1), -1)
+
+    def is_winning(self, piles):
+        """Returns True if the player to move in `piles` can force a win"""
+        return bool(self.win[self.layout.encode(piles)])
+
+    def choose_action(self, state, epsilon=True):
+        """
+        Returns a winning action `(i, j)` in `state`, or takes one object
+        from the largest pile if there is none.
+        """
+        action = self.policy[self.layout.encode(state)]
+        if action < 0:
+            return (max(range(len(state)), key=lambda i: state[i]), 1)
+        return self.actions[action]
+
+    def accuracy(self, ai):
+        """
+        Returns the fraction of winning positions in which
+        `ai.choose_action(piles, epsilon=False)` picks a winning move.
+        """
+        winning = np.flatnonzero(self.win[1:]) + 1
+        correct = 0
+        for s, piles in zip(winning, self.layout.decode(winning).tolist()):
+            i, j = ai.choose_action(piles, epsilon=False)
+            if not self.win[s - j * self.layout.place[i]]:
+                correct += 1
+        return correct / len(winning) if len(winning) else 1.0
+
+    def games_needed(self, target=0.99, step=10000, limit=1000000, player=None, seed=None):
+        """
+        Trains an `ArrayNimAI` on this game `step` games at a time until it
+        finds a winning move in at least `target` of the winning positions.
+        Returns the `(games, accuracy)` measured after each step, stopping
+        at `limit` games.
+        """
+        if not self.misere:
+            raise ValueError("training only plays the misère game")
+        if player is None:
+            player = ArrayNimAI(self.initial, max_take=self.max_take)
+        rng = np.random.default_rng(seed)
+        curve = []
+        while player.games < limit:
+            train_batch(min(step, limit - player.games), player, self.initial, progress=0, seed=rng)
+            curve.append((player.games, self.accuracy(player)))
+            if curve[-1][1] >= target:
+                break
+        return curve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a Nim variant and measure how many training games NimAI needs")
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7], help="initial pile sizes")
+    parser.add_argument("--max-take", type=int, help="most objects a move may take")
+    parser.add_argument("--target", type=float, default=0.99, help="accuracy to train to")
+    parser.add_argument("--step", type=int, default=10000, help="training games between measurements")
+    parser.add_argument("--limit", type=int, default=1000000, help="most training games to play")
+    parser.add_argument("--seed", type=int, default=0, help="training seed")
+    args = parser.parse_args()
+
+    solver = NimSolver(args.piles, args.max_take)
+    won = int(solver.win[1:].sum())
+    print(f"{won} of {len(solver.win) - 1} positions are won for the player to move, "
+          f"the start is {'won' if solver.is_winning(args.piles) else 'lost'}")
+    for games, accuracy in solver.games_needed(args.target, args.step, args.limit, seed=args.seed):
+        print(f"{games}\t{accuracy:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Headless Tic Tac Toe benchmark
+
+Plays engine against engine (and against a random player) without a
+window and reports, per match: results, nodes searched, positions per
+second and per move latency percentiles. `--json` writes the same report
+as JSON so runs can be compared for regressions.
+
+    python benchmark.py
+    python benchmark.py --engines alphabeta bitboard --games 20 --json out.json
+    python benchmark.py --board 5 5 4 --engines mnk --seconds 0.2
+
+Nodes are counted by wrapping the function each engine calls once per
+position searched (`result` for the list board searches, `value` for the
+bitboard engine), so timings include the cost of counting.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import tictactoe as ttt
+import bitboard
+import book
+import mnk
+
+
+class Counter():
+    def __init__(self):
+        self.nodes = 0
+
+    def wrap(self, module, name):
+        """Counts calls to `module.name`, returns a function undoing the wrap"""
+        original = getattr(module, name)
+
+        def counted(*args):
+            self.nodes += 1
+            return original(*args)
+
+        setattr(module, name, counted)
+        return lambda: setattr(module, name, original)
+
+
+def make_engines(game, counter, seconds):
+    """
+    Returns name -> function(board) returning the engine's move.
+    """
+    engines = {"mnk": lambda board: _mnk(game, counter, board, seconds)}
+    if game is ttt:
+        engines["minimax"] = lambda board: _counted(counter, ttt, "result", ttt.minimax, board)
+        engines["alphabeta"] = lambda board: _counted(counter, ttt, "result", ttt.minimax, board, pruning=True)
+        engines["bitboard"] = lambda board: _counted(counter, bitboard, "value", bitboard.minimax, board)
+        engines["book"] = book.lookup
+    return engines
+
+
+def _counted(counter, module, name, engine, board, **kwargs):
+    undo = counter.wrap(module, name)
+    try:
+        return engine(board, **kwargs)
+    finally:
+        undo()
+
+
+def _mnk(game, counter, board, seconds):
+    if game is ttt:
+        game = mnk.Game()
+    move = game.search(board, seconds=seconds)
+    counter.nodes += game.nodes
+    return move
+
+
+def percentile(values, p):
+    """Nearest rank percentile of `values`"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def play_match(game, engines, counter, x, o, games, rng):
+    """
+    Plays `games` games with `x` moving first against `o`, where either
+    may be "random". Returns the stats of the match, latencies and nodes
+    only counting the engines' moves.
+    """
+    results = {"X": 0, "O": 0, "tie": 0}
+    latencies = []
+    nodes = 0
+    for _ in range(games):
+        board = game.initial_state()
+        while not game.terminal(board):
+            name = x if game.player(board) == ttt.X else o
+            if name == "random":
+                move = rng.choice(sorted(game.actions(board)))
+            else:
+                counter.nodes = 0
+                start = time.perf_counter()
+                move = engines[name](board)
+                latencies.append(time.perf_counter() - start)
+                nodes += counter.nodes
+            board = game.result(board, move)
+        winner = game.winner(board)
+        results["tie" if winner is None else winner] += 1
+
+    seconds = sum(latencies)
+    return {
+        "x": x,
+        "o": o,
+        "games": games,
+        "results": results,
+        "moves": len(latencies),
+        "nodes": nodes,
+        "seconds": seconds,
+        "positions_per_second": nodes / seconds if seconds else 0.0,
+        "latency_ms": {
+            f"p{p}": 1000 * percentile(latencies, p) for p in (50, 90, 99)
+        } | {"max": 1000 * max(latencies, default=0.0)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Tic Tac Toe engines without a window")
+    parser.add_argument("--engines", nargs="+", default=["alphabeta", "bitboard", "book"],
+                        help="engines to benchmark: minimax, alphabeta, bitboard, book, mnk")
+    parser.add_argument("--games", type=int, default=10, help="games per match")
+    parser.add_argument("--board", type=int, nargs=3, metavar=("ROWS", "COLUMNS", "K"),
+                        help="play k in a row on a larger board with the mnk engine")
+    parser.add_argument("--seconds", type=float, default=0.5, help="time per move for the mnk engine")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random player")
+    parser.add_argument("--json", metavar="FILE", help="write the report as JSON to FILE, - for stdout")
+    args = parser.parse_args(argv)
+
+    game = ttt if args.board is None or tuple(args.board) == (3, 3, 3) else mnk.Game(*args.board)
+    counter = Counter()
+    engines = make_engines(game, counter, args.seconds)
+    unknown = [name for name in args.engines if name not in engines]
+    if unknown:
+        parser.error(f"unknown engines for this board: {', '.join(unknown)}")
+
+    rng = random.Random(args.seed)
+    matches = []
+    for name in args.engines:
+        for x, o in ((name, name), (name, "random"), ("random", name)):
+            matches.append(play_match(game, engines, counter, x, o, args.games, rng))
+            if game is ttt:
+                bitboard.table.clear()
+
+    report = {
+        "board": list(args.board or (3, 3, 3)),
+        "seed": args.seed,
+        "matches": matches,
+    }
+
+    for match in matches:
+        r = match["results"]
+        lat = match["latency_ms"]
+        print(f"{match['x']:>9} vs {match['o']:<9} games {match['games']:>3}  "
+              f"X {r['X']:>3} O {r['O']:>3} tie {r['tie']:>3}  "
+              f"nodes {match['nodes']:>9}  {match['positions_per_second']:>10.0f} pos/s  "
+              f"p50 {lat['p50']:8.3f}ms p90 {lat['p90']:8.3f}ms p99 {lat['p99']:8.3f}ms",
+              file=sys.stderr if args.json == "-" else sys.stdout)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Bitboard Tic Tac Toe engine
+
+Each player's marks are a 9-bit mask, cell (i, j) being bit 3*i + j.
+Game values are memoised in a transposition table keyed by the position
+reduced over the 8 symmetries of the board.
+"""
+
+from tictactoe import X, O
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+
+def _symmetries():
+    """
+    Returns the 8 symmetries of the board as cell permutations, where
+    cell `k` moves to `perm[k]`.
+    """
+    rotate = lambda i, j: (j, 2 - i)
+    mirror = lambda i, j: (i, 2 - j)
+    perms = []
+    for flip in (False, True):
+        for turns in range(4):
+            perm = []
+            for k in range(9):
+                i, j = divmod(k, 3)
+                if flip:
+                    i, j = mirror(i, j)
+                for _ in range(turns):
+                    i, j = rotate(i, j)
+                perm.append(3 * i + j)
+            perms.append(perm)
+    return perms
+
+
+def _mask_tables():
+    """For every symmetry, maps each 9-bit mask to its transformed mask."""
+    tables = []
+    for perm in _symmetries():
+        table = []
+        for mask in range(1 << 9):
+            out = 0
+            for k in range(9):
+                if mask >> k & 1:
+                    out |= 1 << perm[k]
+            table.append(out)
+        tables.append(table)
+    return tables
+
+
+SYMMETRY_TABLES = _mask_tables()
+
+# Transposition table: canonical key -> game value (1 X wins, -1 O wins, 0 tie)
+table = {}
+
+
+def from_board(board):
+    """
+    Returns the `(x, o)` masks of a nested list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def canonical(x, o):
+    """
+    Returns the smallest key `x | o << 9` over all symmetries of the position.
+    """
+    return min(t[x] | t[o] << 9 for t in SYMMETRY_TABLES)
+
+
+def has_won(mask):
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return True
+    return False
+
+
+def value(x, o):
+    """
+    Returns the value of the position with perfect play from both sides.
+    """
+    if has_won(x):
+        return 1
+    if has_won(o):
+        return -1
+    if x | o == FULL:
+        return 0
+    key = canonical(x, o)
+    if key in table:
+        return table[key]
+
+    x_to_move = bin(x).count("1") == bin(o).count("1")
+    free = FULL & ~(x | o)
+    best = -2 if x_to_move else 2
+    while free:
+        move = free & -free
+        free ^= move
+        if x_to_move:
+            best = max(best, value(x | move, o))
+            if best == 1:
+                break
+        else:
+            best = min(best, value(x, o | move))
+            if best == -1:
+                break
+    table[key] = best
+    return best
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    x, o = from_board(board)
+    if has_won(x) or has_won(o) or x | o == FULL:
+        return None
+    x_to_move = bin(x).count("1") == bin(o).count("1")
+    best, act = None, None
+    for k in range(9):
+        move = 1 << k
+        if (x | o) & move:
+            continue
+        v = value(x | move, o) if x_to_move else value(x, o | move)
+        if best is None or (v > best if x_to_move else v < best):
+            best, act = v, divmod(k, 3)
+    return act
@@ -0,0 +1,138 @@
+"""
+Tic Tac Toe opening book
+
+Holds the best move and game value of every reachable position, solved
+once with the bitboard engine. Positions are reduced over the 8 board
+symmetries and the canonical position, written in base 3, indexes a
+one byte entry, so a lookup is a single read from the memory mapped file.
+
+Run `python book.py` to build the book, otherwise it is built the first
+time it is needed, and kept in memory if it cannot be saved.
+"""
+
+import mmap
+import os
+
+from bitboard import FULL, SYMMETRY_TABLES, _symmetries, from_board, has_won, value
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+MAGIC = b"TTTB\x01"
+ENTRIES = 3 ** 9
+
+# Entry for a position not in the book (terminal or unreachable)
+MISSING = 0xFF
+
+PERMS = _symmetries()
+
+# INVERSE[s][k] is the cell that symmetry s moves to cell k
+INVERSE = []
+for perm in PERMS:
+    inverse = [0] * 9
+    for k, moved in enumerate(perm):
+        inverse[moved] = k
+    INVERSE.append(inverse)
+
+# TERNARY[mask] is the sum of 3 ** k over the bits k set in a 9-bit mask
+TERNARY = [sum(3 ** k for k in range(9) if mask >> k & 1) for mask in range(1 << 9)]
+
+_book = None
+
+
+def canonical(x, o):
+    """
+    Returns the base 3 index of the position reduced over all symmetries,
+    and the symmetry that reduces it.
+    """
+    _, s = min((t[x] | t[o] << 9, s) for s, t in enumerate(SYMMETRY_TABLES))
+    t = SYMMETRY_TABLES[s]
+    return TERNARY[t[x]] + 2 * TERNARY[t[o]], s
+
+
+def build():
+    """
+    Returns the book as a bytearray. Each entry holds the best move in the
+    low 4 bits and the game value + 1 in the next 2 bits.
+    """
+    entries = bytearray([MISSING]) * ENTRIES
+    stack = [(0, 0)]
+    seen = {(0, 0)}
+    while stack:
+        x, o = stack.pop()
+        if has_won(x) or has_won(o) or x | o == FULL:
+            continue
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        index, s = canonical(x, o)
+        best, act = None, None
+        for k in range(9):
+            move = 1 << k
+            if (x | o) & move:
+                continue
+            child = (x | move, o) if x_to_move else (x, o | move)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+            v = value(*child)
+            if best is None or (v > best if x_to_move else v < best):
+                best, act = v, k
+        # moves are stored in the frame of the canonical position
+        if entries[index] == MISSING:
+            entries[index] = PERMS[s][act] | (best + 1) << 4
+    return entries
+
+
+def save(path=PATH):
+    """
+    Builds the book and writes it to `path`.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(build())
+    os.replace(tmp, path)
+
+
+def load(path=PATH):
+    """
+    Memory maps the book at `path`, building and saving it first if needed.
+    If the book cannot be saved there (e.g. a read-only install) it is
+    built and kept in memory instead.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) != len(MAGIC) + ENTRIES:
+        try:
+            save(path)
+        except OSError:
+            return MAGIC + build()
+    with open(path, "rb") as f:
+        book = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if book[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a tic-tac-toe opening book")
+    return book
+
+
+def probe(board):
+    """
+    Returns `(action, value)` for the board, or None if the game is over.
+    The book is loaded on the first call.
+    """
+    global _book
+    if _book is None:
+        _book = load()
+    index, s = canonical(*from_board(board))
+    entry = _book[len(MAGIC) + index]
+    if entry == MISSING:
+        return None
+    return divmod(INVERSE[s][entry & 0xF], 3), (entry >> 4) - 1
+
+
+def lookup(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    found = probe(board)
+    return None if found is None else found[0]
+
+
+if __name__ == "__main__":
+    save()
+    print(f"Wrote {PATH}")
@@ -0,0 +1,270 @@
+"""
+m,n,k game engine
+
+Tic Tac Toe generalised to a board of m rows and n columns where the first
+player to get k marks in a row (across, down or diagonally) wins, e.g.
+4x4 with k=4, 5x5 with k=4 or 15x15 gomoku with k=5.
+
+Boards are nested lists like in `tictactoe`, so a `Game` can stand in for
+the `tictactoe` module. Full minimax is out of reach beyond 3x3, so
+`Game.search` runs iterative deepening alpha-beta within a time budget and
+scores the positions it stops at with a pluggable evaluation function.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, quicker wins score higher
+WIN = 10 ** 12
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Timeout(Exception):
+    pass
+
+
+def open_lines(game, cells):
+    """
+    Default evaluation of flat `cells` from X's point of view. Every window
+    of k cells holding marks of only one player is worth 10 ** (marks - 1)
+    to that player.
+    """
+    score = 0
+    for window in game.windows:
+        line = [cells[c] for c in window]
+        xs = line.count(X)
+        os = line.count(O)
+        if xs and not os:
+            score += 10 ** (xs - 1)
+        elif os and not xs:
+            score -= 10 ** (os - 1)
+    return score
+
+
+class Game():
+
+    def __init__(self, m=3, n=3, k=3):
+        """
+        Precomputes, for every cell, the rays of up to k - 1 cells leading
+        away from it in each direction, and every window of k cells in a row.
+        """
+        if not 0 < k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on a {m}x{n} board")
+        self.m, self.n, self.k = m, n, k
+        self.size = m * n
+
+        # rays[cell] holds a (forward, backward) pair of flat indices per direction
+        self.rays = []
+        for i in range(m):
+            for j in range(n):
+                pairs = []
+                for di, dj in DIRECTIONS:
+                    pairs.append((self._ray(i, j, di, dj), self._ray(i, j, -di, -dj)))
+                self.rays.append(pairs)
+
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    ray = self._ray(i, j, di, dj)
+                    if len(ray) == k - 1:
+                        self.windows.append((i * n + j, *ray))
+
+        # Flat indices within two steps of each cell, where search looks for moves
+        self.nearby = []
+        for i in range(m):
+            for j in range(n):
+                self.nearby.append([
+                    a * n + b
+                    for a in range(max(0, i - 2), min(m, i + 3))
+                    for b in range(max(0, j - 2), min(n, j + 3))
+                    if (a, b) != (i, j)
+                ])
+
+        self.nodes = 0
+        self.depth = 0
+
+    def _ray(self, i, j, di, dj):
+        ray = []
+        for step in range(1, self.k):
+            a, b = i + step * di, j + step * dj
+            if not (0 <= a < self.m and 0 <= b < self.n):
+                break
+            ray.append(a * self.n + b)
+        return ray
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        count_X = sum(row.count(X) for row in board)
+        count_O = sum(row.count(O) for row in board)
+        return X if count_X <= count_O else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n) if board[i][j] is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError
+        temp = [row.copy() for row in board]
+        temp[i][j] = self.player(board)
+        return temp
+
+    def wins(self, cells, cell):
+        """
+        Returns True if the mark on flat `cells[cell]` completes k in a row,
+        only looking at the lines through that cell.
+        """
+        mark = cells[cell]
+        for forward, backward in self.rays[cell]:
+            count = 1
+            for c in forward:
+                if cells[c] != mark:
+                    break
+                count += 1
+            for c in backward:
+                if cells[c] != mark:
+                    break
+                count += 1
+            if count >= self.k:
+                return True
+        return False
+
+    def winner(self, board, last=None):
+        """
+        Returns the winner of the game, if there is one. If the last move
+        `(i, j)` is given only the lines through it are checked.
+        """
+        cells = flatten(board)
+        if last is not None:
+            cell = last[0] * self.n + last[1]
+            return cells[cell] if cells[cell] is not EMPTY and self.wins(cells, cell) else None
+        for window in self.windows:
+            mark = cells[window[0]]
+            if mark is not EMPTY and all(cells[c] == mark for c in window):
+                return mark
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) is not None or all(EMPTY not in row for row in board)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1}.get(self.winner(board), 0)
+
+    def candidates(self, cells, first=None):
+        """
+        Returns the empty cells within two steps of a mark, or the centre on
+        an empty board, trying `first` before the rest.
+        """
+        taken = [c for c in range(self.size) if cells[c] is not EMPTY]
+        if not taken:
+            return [(self.m // 2) * self.n + self.n // 2]
+        seen = set()
+        moves = []
+        for c in taken:
+            for near in self.nearby[c]:
+                if cells[near] is EMPTY and near not in seen:
+                    seen.add(near)
+                    moves.append(near)
+        if first in seen:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def search(self, board, seconds=1.0, evaluate=open_lines, max_depth=None):
+        """
+        Returns the best action found for the current player within
+        `seconds`, searching one ply deeper each iteration and keeping the
+        move of the deepest search that finished. `evaluate(game, cells)`
+        scores the flat cells of a position from X's point of view.
+        The nodes searched and depth reached are left on `nodes` and `depth`.
+        """
+        cells = flatten(board)
+        if self.terminal(board):
+            return None
+        mark = self.player(board)
+        sign = 1 if mark == X else -1
+        empty = cells.count(EMPTY)
+        if max_depth is None or max_depth > empty:
+            max_depth = empty
+        deadline = time.perf_counter() + seconds
+        self.nodes = 0
+        self.depth = 0
+
+        def negamax(mark, sign, depth, alpha, beta, ply, last):
+            self.nodes += 1
+            if self.nodes & 255 == 0 and time.perf_counter() > deadline:
+                raise Timeout
+            if last is not None and self.wins(cells, last):
+                return -(WIN - ply)
+            if EMPTY not in cells:
+                return 0
+            if depth == 0:
+                return sign * evaluate(self, cells)
+            other = O if mark == X else X
+            best = -math.inf
+            for move in self.candidates(cells):
+                cells[move] = mark
+                v = -negamax(other, -sign, depth - 1, -beta, -alpha, ply + 1, move)
+                cells[move] = EMPTY
+                if v > best:
+                    best = v
+                if best > alpha:
+                    alpha = best
+                if alpha >= beta:
+                    break
+            return best
+
+        other = O if mark == X else X
+        moves = self.candidates(cells)
+        best_move = moves[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                best, choice = -math.inf, None
+                alpha = -math.inf
+                for move in self.candidates(cells, best_move):
+                    cells[move] = mark
+                    v = -negamax(other, -sign, depth - 1, -math.inf, -alpha, 1, move)
+                    cells[move] = EMPTY
+                    if v > best:
+                        best, choice = v, move
+                    alpha = max(alpha, best)
+            except Timeout:
+                # the interrupted search leaves marks behind, but cells are not used again
+                break
+            best_move = choice
+            self.depth = depth
+            # a forced result will not change with deeper search
+            if abs(best) >= WIN - max_depth:
+                break
+        return divmod(best_move, self.n)
+
+
+def flatten(board):
+    """
+    Returns the cells of a nested list board row by row.
+    """
+    return [cell for row in board for cell in row]
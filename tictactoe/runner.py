@@ -1,8 +1,18 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
+import book
+import mnk
+
+# Optional board size: python runner.py ROWS COLUMNS K
+if len(sys.argv) == 4:
+    rows, cols, k = map(int, sys.argv[1:])
+else:
+    rows, cols, k = 3, 3, 3
+game = ttt if (rows, cols, k) == (3, 3, 3) else mnk.Game(rows, cols, k)
 
 pygame.init()
 size = width, height = 600, 400
@@ -15,11 +25,24 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+# The board is centred between the title above and the Play Again button below, 80px from each edge
+tile_size = int(min(80, (height - 160) / rows, (width - 40) / cols))
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+
+# The AI thinks in a background thread while the window keeps drawing
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+ai_started = 0
+
+
+def ai_move(board):
+    if game is ttt:
+        return book.lookup(board)
+    return game.search(board, seconds=1.0)
+
 
 while True:
 
@@ -67,13 +90,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +111,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,30 +124,29 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = "Computer thinking" + "." * (int(time.time() * 2) % 4)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, played no sooner than half a second after it started thinking
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_future is None:
+                ai_future = executor.submit(ai_move, board)
+                ai_started = time.time()
+            elif ai_future.done() and time.time() - ai_started >= 0.5:
+                board = game.result(board, ai_future.result())
+                ai_future = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -140,7 +161,9 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = game.initial_state()
+                    if ai_future is not None:
+                        ai_future.cancel()
+                        ai_future = None
 
     pygame.display.flip()
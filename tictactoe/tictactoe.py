@@ -94,10 +94,75 @@ def utility(board):
 
 
 
-def minimax(board):
+# Centre first, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def ordered_actions(board, killer=None):
+    """
+    Returns the actions on the board, trying the killer move first and
+    then centre, corners and edges.
+    """
+    moves = [action for action in MOVE_ORDER if board[action[0]][action[1]] is EMPTY]
+    if killer in moves:
+        moves.remove(killer)
+        moves.insert(0, killer)
+    return moves
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player on the board, using
+    alpha-beta pruning. Killer moves (the last move that caused a cutoff at
+    each ply) are tried first, and a side stops searching as soon as it
+    finds a forced win.
+    """
+    killers = {}
+
+    def max_value(board, alpha, beta, ply):
+        if terminal(board):
+            return (utility(board), None)
+        v, act = -math.inf, None
+        for action in ordered_actions(board, killers.get(ply)):
+            w = min_value(result(board, action), alpha, beta, ply + 1)[0]
+            if w > v:
+                v, act = w, action
+            if v == 1 or v >= beta:
+                killers[ply] = action
+                break
+            alpha = max(alpha, v)
+        return (v, act)
+
+    def min_value(board, alpha, beta, ply):
+        if terminal(board):
+            return (utility(board), None)
+        v, act = math.inf, None
+        for action in ordered_actions(board, killers.get(ply)):
+            w = max_value(result(board, action), alpha, beta, ply + 1)[0]
+            if w < v:
+                v, act = w, action
+            if v == -1 or v <= alpha:
+                killers[ply] = action
+                break
+            beta = min(beta, v)
+        return (v, act)
+
+    if terminal(board):
+        return None
+    elif player(board) == X:
+        return max_value(board, -math.inf, math.inf, 0)[1]
+    else:
+        return min_value(board, -math.inf, math.inf, 0)[1]
+
+
+def minimax(board, pruning=False):
     """
     Returns the optimal action for the current player on the board.
+    With `pruning` the search uses alpha-beta pruning (see `alphabeta`).
     """
+    if pruning:
+        return alphabeta(board)
+
     def max_value(board):
         if terminal(board):
             return (utility(board),None)